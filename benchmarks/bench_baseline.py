@@ -0,0 +1,62 @@
+"""Benchmark for baseline removal against scipy.signal.medfilt.
+
+The reference is ``signal.medfilt(data, 251)``, the odd-kernel version of
+what ``remove_baseline`` used to call (an even 250 kernel is rejected by
+medfilt). Each method reports its run time and its deviation from the
+reference baseline, relative to the signal's standard deviation. The
+first and last second are excluded from the error, because medfilt pads
+with zeros and the other methods do not.
+
+    python benchmarks/bench_baseline.py [minutes] [fs]
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy import signal
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.signal_processing import estimate_baseline  # noqa: E402
+
+
+def synthetic_ecg(fs, minutes, seed=0):
+    """Pulse train with respiration-like baseline wander and noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(minutes * 60 * fs)) / fs
+    ecg = 0.4 * np.sin(2 * np.pi * 0.25 * t) + 0.2 * np.sin(2 * np.pi * 0.05 * t)
+    ecg += rng.normal(0, 0.03, size=t.shape)
+    beats = (np.arange(0, t[-1], 0.8) * fs).astype(np.int64)
+    for shift, weight in enumerate(np.exp(-0.5 * (np.arange(-15, 16) / 4.0) ** 2), start=-15):
+        ecg[np.clip(beats + shift, 0, len(t) - 1)] += weight
+    return ecg
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main(minutes=30, fs=360):
+    ecg = synthetic_ecg(fs, minutes)
+    print(f"signal: {minutes} min at {fs} Hz = {len(ecg):,} samples")
+
+    reference, t_ref = timed(signal.medfilt, ecg, 251)
+    print(f"{'medfilt(251)':<22} {t_ref:8.3f} s  (reference)")
+
+    scale = np.std(ecg)
+    interior = slice(fs, len(ecg) - fs)
+    for label, kwargs in [('median', {}),
+                          ('cascade 200/600 ms', {'method': 'cascade', 'fs': fs}),
+                          ('decimate x10', {'method': 'decimate', 'factor': 10}),
+                          ('decimate x25', {'method': 'decimate', 'factor': 25})]:
+        baseline, seconds = timed(estimate_baseline, ecg, 250, **kwargs)
+        err = np.abs(baseline - reference)[interior] / scale
+        print(f"{label:<22} {seconds:8.3f} s  {t_ref / seconds:6.1f}x  "
+              f"max err {err.max():.3f}  mean err {err.mean():.4f} (x std)")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,90 @@
+"""Microbenchmark for Bar._display().
+
+Compares the per-call cost of the cached render engine with the previous
+implementation, which rebuilt colors, bar strings and f-strings on every
+redraw. Output goes to an in-memory sink so only rendering is measured.
+
+    python benchmarks/bench_display.py
+"""
+import io
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from stylish_progress.display import Bar, Colors  # noqa: E402
+
+
+class _Loader(object):
+    """Minimal dataloader stand-in with a `len()` that is not free"""
+    def __init__(self, n_batches, batch_size):
+        self.dataset = range(n_batches * batch_size)
+        self.batch_size = batch_size
+        self._n = n_batches
+
+    def __len__(self):
+        return self._n
+
+    def __iter__(self):
+        return iter(range(self._n))
+
+
+class LegacyBar(Bar):
+    """Bar with the pre-cache `_display()` kept for comparison"""
+    def _display(self):
+        eta = self._estimator.eta(len(self.dataloader) - self._idx) or 0
+
+        rate = self._idx / len(self.dataloader)
+        percentage = int(rate * 100)
+        len_bar = int(rate * self._DISPLAY_LENGTH)
+
+        colors = self._get_status_colors()
+
+        bar_fill = '━' * len_bar
+        bar_empty = '╌' * (self._DISPLAY_LENGTH - len_bar)
+
+        idx = str(self._batch_idx).rjust(len(str(len(self.dataset))), ' ')
+
+        prefix = f"{colors['desc_color']}{self.desc}{Colors.ENDC}"
+        progress = f"{colors['bar_color']}{bar_fill}{bar_empty}{Colors.ENDC}"
+        stats = f"{colors['stats_color']}{percentage:3d}%{Colors.ENDC}"
+
+        loss_display = ""
+        if self.last_loss is not None:
+            loss_display = f" {Colors.YELLOW}loss:{self.last_loss:.4f}{Colors.ENDC}"
+
+        time_display = f"{colors['time_color']}{eta:.1f}s{Colors.ENDC}"
+
+        if self.compact:
+            tmpl = f"\r{prefix} {stats} {idx}/{len(self.dataset)} [{progress}] {time_display}{loss_display}"
+        else:
+            time_info = f"ETA: {time_display}"
+            tmpl = f"\r{prefix}: |{progress}| {stats} {idx}/{len(self.dataset)} {time_info}{loss_display}"
+
+        sys.stdout.write(tmpl)
+        sys.stdout.flush()
+
+
+def bench(bar_cls, number):
+    bar = bar_cls(_Loader(1000, 32), desc="Training")
+    bar.update_loss(0.1234)
+    bar._idx, bar._batch_idx = 500, 500 * 32
+    stdout, sys.stdout = sys.stdout, io.StringIO()
+    try:
+        seconds = min(timeit.repeat(bar._display, number=number, repeat=5))
+    finally:
+        sys.stdout = stdout
+    return seconds / number * 1e6
+
+
+def main(number=20000):
+    legacy = bench(LegacyBar, number)
+    cached = bench(Bar, number)
+    print(f"legacy _display(): {legacy:7.2f} us/call")
+    print(f"cached _display(): {cached:7.2f} us/call")
+    print(f"speedup:           {legacy / cached:7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
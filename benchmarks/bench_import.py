@@ -0,0 +1,50 @@
+"""Startup-time benchmark for `import stylish_progress`.
+
+Runs ``python -X importtime -c "import stylish_progress"`` in fresh
+interpreters, reports the cumulative import time of the package and fails
+(exit status 1) when the best run is over budget or when a heavy
+dependency such as torch or tensorboard gets imported.
+
+    python benchmarks/bench_import.py [budget_ms]
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BUDGET_MS = 20.0
+FORBIDDEN = ('torch', 'tensorboard', 'numpy', 'multiprocessing')
+
+
+def import_profile():
+    """Return {module: cumulative_us} for one fresh `import stylish_progress`"""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    env.pop('PYTHONDONTWRITEBYTECODE', None)  # Measure with cached bytecode
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import stylish_progress'],
+                            env=env, capture_output=True, text=True, check=True)
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # "import time:  self [us] | cumulative | imported package"
+        _, cumulative, name = line[len('import time:'):].split('|')
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def main(budget_ms=BUDGET_MS, runs=10):
+    import_profile()  # Warm up bytecode and filesystem caches
+    profiles = [import_profile() for _ in range(runs)]
+    best = min(p['stylish_progress'] for p in profiles) / 1000
+    heavy = sorted({name for name in profiles[0]
+                    if name.split('.')[0] in FORBIDDEN})
+
+    print(f"import stylish_progress: {best:.2f} ms (best of {runs}, budget {budget_ms:.1f} ms)")
+    if heavy:
+        print(f"heavy modules imported: {', '.join(heavy)}")
+    return 0 if best <= budget_ms and not heavy else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(*(float(arg) for arg in sys.argv[1:2])))
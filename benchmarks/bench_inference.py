@@ -0,0 +1,86 @@
+"""Throughput benchmark for batched CPU inference with ``BatchPredictor``.
+
+Builds a small MLP classifier as an ONNX model (needs the ``onnx`` package)
+and classifies about a day's worth of beats. It compares a single call on
+the whole array (the previous ``predict``), one call per beat, and the
+micro-batch engine with fixed and auto-tuned batch sizes, with and without
+prefetching. It also checks that every variant returns the same outputs.
+
+    python benchmarks/bench_inference.py [n_beats]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import onnx
+from onnx import TensorProto, helper, numpy_helper
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.model_utils import BatchPredictor, ECGClassifier  # noqa: E402
+
+
+def build_model(path, segment_size=300, hidden=256, n_classes=15, seed=0):
+    """Two-layer MLP with a softmax head and a dynamic batch dimension"""
+    rng = np.random.default_rng(seed)
+    w1 = (rng.normal(size=(segment_size, hidden)) / np.sqrt(segment_size)).astype(np.float32)
+    w2 = (rng.normal(size=(hidden, n_classes)) / np.sqrt(hidden)).astype(np.float32)
+    graph = helper.make_graph(
+        [helper.make_node('MatMul', ['x', 'w1'], ['h']),
+         helper.make_node('Relu', ['h'], ['r']),
+         helper.make_node('MatMul', ['r', 'w2'], ['logits']),
+         helper.make_node('Softmax', ['logits'], ['y'], axis=-1)],
+        'ecg_mlp',
+        [helper.make_tensor_value_info('x', TensorProto.FLOAT, ['N', segment_size])],
+        [helper.make_tensor_value_info('y', TensorProto.FLOAT, ['N', n_classes])],
+        [numpy_helper.from_array(w1, 'w1'), numpy_helper.from_array(w2, 'w2')])
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 17)])
+    model.ir_version = 8
+    onnx.save(model, path)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main(n_beats=100_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = Path(tmp) / 'ecg_mlp.onnx'
+        build_model(model_path)
+        classifier = ECGClassifier(model_path)
+
+    # float64 segments as produced by extract_segments without a dtype
+    segments = np.random.default_rng(1).normal(size=(n_beats, 300))
+    print(f"{n_beats:,} beats of 300 samples")
+
+    reference, t_whole = timed(classifier.predict, segments)
+    print(f"{'single call':<24} {t_whole:7.3f} s {n_beats / t_whole:>12,.0f} beats/s")
+
+    n_loop = min(n_beats, 5_000)
+    _, t_loop = timed(lambda: [classifier.predict(segments[i:i + 1]) for i in range(n_loop)])
+    print(f"{'one call per beat':<24} {t_loop * n_beats / n_loop:7.3f} s "
+          f"{n_loop / t_loop:>12,.0f} beats/s (extrapolated)")
+
+    for batch_size in (64, 256, 1024, 'auto'):
+        for prefetch in (False, True):
+            engine = BatchPredictor(classifier, batch_size=batch_size, prefetch=prefetch)
+            if batch_size == 'auto':
+                engine.tune(segments[0])
+            outputs, elapsed = timed(engine.predict, segments)
+            assert np.allclose(outputs, reference, atol=1e-5), "batched outputs differ"
+            label = f"batch={engine.batch_size}{' (auto)' if batch_size == 'auto' else ''}"
+            label += " prefetch" if prefetch else ""
+            print(f"{label:<24} {elapsed:7.3f} s {n_beats / elapsed:>12,.0f} beats/s")
+
+    stream = classifier.engine('auto')
+    outputs, elapsed = timed(lambda: np.concatenate(list(stream.predict_stream(iter(segments)))))
+    assert np.allclose(outputs, reference, atol=1e-5), "streamed outputs differ"
+    print(f"{'predict_stream':<24} {elapsed:7.3f} s {n_beats / elapsed:>12,.0f} beats/s")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,89 @@
+"""Latency/throughput benchmark for the CPU modes of ``ECGClassifier``'s pytorch path.
+
+Saves a small 1-D CNN beat classifier as a full pickled model, loads it in
+each ``torch_mode`` and checks parity against eager outputs. It then
+measures single-beat latency and batched throughput. The eager model is
+also exported to ONNX and run through the ONNX Runtime path for comparison.
+
+    python benchmarks/bench_torch_inference.py [n_beats]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+from torch import nn
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.model_utils import ECGClassifier  # noqa: E402
+
+
+class BeatNet(nn.Module):
+    """Conv feature extractor followed by a two-layer MLP head"""
+
+    def __init__(self, segment_size=300, n_classes=15):
+        super().__init__()
+        self.features = nn.Sequential(
+            nn.Conv1d(1, 16, 7, stride=2, padding=3), nn.ReLU(),
+            nn.Conv1d(16, 32, 5, stride=2, padding=2), nn.ReLU(),
+            nn.AdaptiveAvgPool1d(15))
+        self.head = nn.Sequential(
+            nn.Flatten(), nn.Linear(32 * 15, 256), nn.ReLU(),
+            nn.Linear(256, 256), nn.ReLU(), nn.Linear(256, n_classes))
+
+    def forward(self, x):
+        return self.head(self.features(x.unsqueeze(1)))
+
+
+def measure(classifier, segments, batch_size=256, n_latency=200):
+    # warm-up for both shapes (trace and compile specialize on the first inputs)
+    classifier.predict(segments[:batch_size])
+    classifier.predict(segments[:1])
+    start = time.perf_counter()
+    for i in range(n_latency):
+        classifier.predict(segments[i:i + 1])
+    latency = (time.perf_counter() - start) / n_latency
+    start = time.perf_counter()
+    for i in range(0, len(segments), batch_size):
+        classifier.predict(segments[i:i + batch_size])
+    throughput = len(segments) / (time.perf_counter() - start)
+    return latency, throughput
+
+
+def main(n_beats=20_000):
+    torch.manual_seed(0)
+    segments = np.random.default_rng(0).normal(size=(n_beats, 300)).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = Path(tmp) / 'beatnet.pt'
+        torch.save(BeatNet().eval(), model_path)
+
+        print(f"{'mode':<10} {'latency':>10} {'throughput':>14}  parity")
+        eager = None
+        for mode in ('eager', 'quantized', 'script', 'trace', 'compile', 'onnx'):
+            try:
+                if mode == 'onnx':
+                    onnx_path = eager.export_onnx(Path(tmp) / 'beatnet.onnx', segments)
+                    classifier = ECGClassifier(onnx_path, 'onnx')
+                    diff = np.abs(classifier.predict(segments[:1000])
+                                  - eager.predict(segments[:1000])).max()
+                    parity = f"max|diff|={diff:.2e}"
+                else:
+                    classifier = ECGClassifier(model_path, 'pytorch', torch_mode=mode)
+                    if mode == 'eager':
+                        eager = classifier
+                    result = classifier.check_parity(segments[:1000])
+                    parity = (f"max|diff|={result['max_abs_diff']:.2e} "
+                              f"top1={result['top1_agreement']:.3f}")
+                latency, throughput = measure(classifier, segments)
+            except Exception as e:
+                print(f"{mode:<10} skipped: {str(e).splitlines()[0]}")
+                continue
+            print(f"{mode:<10} {latency * 1e3:8.3f}ms {throughput:>10,.0f} b/s  {parity}")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -1,4 +1,19 @@
-from .display import Bar, Writer, Colors
+from .display import Bar, Writer, Colors, ProgressFile
 
 __version__ = "0.1.0"
-__all__ = ['Bar', 'Writer', 'Colors'] 
\ No newline at end of file
+__all__ = ['Bar', 'Writer', 'Colors', 'DistributedBar', 'BarGroup', 'ProgressFile']
+
+# Imported on first use to keep `import stylish_progress` stdlib-light
+_LAZY = {
+    'DistributedBar': '.distributed',
+    'BarGroup': '.group',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,8 +1,11 @@
-from torch.utils.tensorboard import SummaryWriter
 import time
 import os
-import torch
 import sys
+import atexit
+import threading
+import warnings
+import weakref
+from collections import deque
 
 
 class Colors:
@@ -31,20 +34,178 @@ class ProgressBarStatus:
     COMPLETED = "completed" 
     INTERRUPTED = "interrupted"
 
-class Bar(object):
-    def __init__(self, dataloader, desc="Training", color=Colors.CYAN):
-        if not hasattr(dataloader, 'dataset'):
-            raise ValueError('Attribute `dataset` not exists in dataloader.')
-        if not hasattr(dataloader, 'batch_size'):
-            raise ValueError('Attribute `batch_size` not exists in dataloader.')
+class RateEstimator(object):
+    """Smoothed step-time estimator used for rate and ETA display.
+
+    Step times are fed through an exponential moving average with weight
+    ``smoothing`` for the newest sample. When ``window`` is set, the last
+    ``window`` step times are also kept in a ring buffer and their median is
+    used instead, which is robust to occasional slow steps. The first
+    ``warmup`` updates (JIT, cudnn autotune, cold page cache) are ignored.
+    
+    An update may cover several steps (or units such as bytes); the time
+    per step is then the interval divided by the number of steps.
+    """
+    def __init__(self, smoothing=0.3, window=None, warmup=1):
+        if not 0 < smoothing <= 1:
+            raise ValueError('`smoothing` must be in (0, 1].')
+        self.smoothing = smoothing
+        self.window = window
+        self.warmup = warmup
+        self.reset()
+    
+    def reset(self):
+        """Forget all samples"""
+        self.n = 0
+        self.updates = 0
+        self._last = None
+        self._ema = None
+        self._samples = deque(maxlen=self.window) if self.window else None
+    
+    def update(self, n=1, now=None):
+        """Record that `n` more steps finished at time `now`
         
+        The very first call only marks the start time.
+        """
+        if now is None:
+            now = time.perf_counter()
+        last = self._last
+        if last is None:
+            # First call only starts the clock
+            self._last = now
+            return
+        if n <= 0:
+            return
+        self._last = now
+        self.n += n
+        self.updates += 1
+        if self.updates <= self.warmup:
+            return
+        dt = (now - last) / n
+        if self._ema is None:
+            self._ema = dt
+        else:
+            self._ema += self.smoothing * (dt - self._ema)
+        if self._samples is not None:
+            self._samples.append(dt)
+    
+    @property
+    def step_time(self):
+        """Estimated seconds per step, or None before the first usable sample"""
+        if self._samples:
+            # Median without importing `statistics` (keeps package import cheap)
+            samples = sorted(self._samples)
+            mid = len(samples) // 2
+            if len(samples) % 2:
+                return samples[mid]
+            return (samples[mid - 1] + samples[mid]) / 2
+        return self._ema
+    
+    @property
+    def rate(self):
+        """Estimated steps per second (0.0 while unknown)"""
+        step_time = self.step_time
+        if not step_time:
+            return 0.0
+        return 1.0 / step_time
+    
+    def eta(self, remaining):
+        """Seconds left for `remaining` steps, or None while unknown"""
+        step_time = self.step_time
+        if step_time is None:
+            return None
+        return max(0, remaining) * step_time
+
+def _scale_units(value, unit, binary=False):
+    """Format `value` with an SI (k, M, G) or binary (Ki, Mi, Gi) prefix"""
+    base, prefixes = (1024.0, ('', 'Ki', 'Mi', 'Gi', 'Ti', 'Pi')) if binary \
+        else (1000.0, ('', 'k', 'M', 'G', 'T', 'P'))
+    for prefix in prefixes[:-1]:
+        if abs(value) < base:
+            break
+        value /= base
+    else:
+        prefix = prefixes[-1]
+    sep = " " if len(unit) > 2 else ""
+    if not prefix and float(value).is_integer():
+        return f"{int(value)}{sep}{unit}"
+    return f"{value:.1f}{prefix}{sep}{unit}"
+
+def _cheap_len(obj):
+    """Return len(obj), or None for objects without a length (generators, streams)"""
+    try:
+        return len(obj)
+    except TypeError:
+        return None
+
+class Bar(object):
+    """Progress bar wrapping a dataloader or any other iterable.
+    
+    Dataloaders (objects with ``dataset`` and ``batch_size``) count samples
+    out of the dataset size. Other iterables count items out of ``total``,
+    which defaults to ``len(iterable)`` when the iterable has a length. When
+    no total is known the bar shows the count, rate and elapsed time only.
+    The iterable is consumed lazily and ``len()`` is called at most once.
+    
+    Passing ``None`` instead of an iterable gives a manual bar that is
+    advanced with :meth:`update`, e.g. by a :class:`ProgressFile` while
+    copying data. ``unit`` adds a rate in units/s to the line and
+    ``unit_scale`` formats counts with SI prefixes (binary prefixes for
+    ``unit='B'``, giving KiB/MiB/GiB). Call :meth:`reset` to reuse a
+    finished manual bar for the next transfer.
+    
+    With a :class:`Writer`, every step appends loss, it/s, samples/s and ETA
+    to the writer's buffer (tags prefixed with ``writer_prefix``).
+
+    Redraws are throttled: the line is rebuilt only when at least
+    ``mininterval`` seconds and ``miniters`` iterations have passed since the
+    last redraw. With ``adaptive=True`` the measured cost of a redraw is also
+    taken into account, so that rendering stays under ``max_overhead``
+    (1% by default) of the loop time. The final line is always drawn.
+    
+    Rate and ETA come from a :class:`RateEstimator`; ``smoothing``,
+    ``window`` and ``warmup`` are passed through to it. Use :meth:`stats`
+    to read it/s, samples/s and ETA programmatically.
+    
+    With ``asynchronous=True`` iteration only updates counters and a daemon
+    thread redraws the line ``refresh_rate`` times per second, so a slow
+    stdout (pipes, ssh, network filesystems) never blocks the loop. The
+    thread is joined before the final line is drawn. A loop left early with
+    ``break`` draws no final line; call :meth:`close` (or let the bar be
+    garbage collected) to stop the thread.
+    """
+    def __init__(self, dataloader, desc="Training", color=Colors.CYAN, total=None,
+                 mininterval=0.1, miniters=1, adaptive=False, max_overhead=0.01,
+                 smoothing=0.3, window=None, warmup=1,
+                 asynchronous=False, refresh_rate=10,
+                 unit=None, unit_scale=False, writer=None, writer_prefix="train"):
         self.dataloader = dataloader
-        self.iterator = iter(dataloader)
-        self.dataset = dataloader.dataset
-        self.batch_size = dataloader.batch_size
+        self.iterator = None  # Created lazily by __iter__ / __next__
+        # Lengths are looked up once; they can be expensive on lazy datasets
+        if total is None and dataloader is not None:
+            total = _cheap_len(dataloader)
+        self._total = total
+        self.unit = unit
+        self.unit_scale = unit_scale
+        
+        if hasattr(dataloader, 'dataset') and hasattr(dataloader, 'batch_size'):
+            # Dataloader: count samples out of the dataset size
+            self.dataset = dataloader.dataset
+            self.batch_size = dataloader.batch_size or 1
+            self._dataset_len = _cheap_len(self.dataset)
+        else:
+            self.dataset = None
+            self.batch_size = 1
+            self._dataset_len = None
+        if self._dataset_len is None:
+            # No usable dataset size: count iterations instead of samples
+            self._step = 1
+            self._dataset_len = self._total
+        else:
+            self._step = self.batch_size
         self._idx = 0
         self._batch_idx = 0
-        self._time = []
+        self._estimator = RateEstimator(smoothing=smoothing, window=window, warmup=warmup)
         self._DISPLAY_LENGTH = 40  # Wider bar for better visualization
         self.desc = desc
         self.default_color = color
@@ -54,27 +215,72 @@ class Bar(object):
         # Status tracking
         self.status = ProgressBarStatus.TRAINING
         self._completed_naturally = False
+        self._finalized = False  # Final line already drawn for this pass
         self._start_time = time.time()
         
+        # Redraw policy
+        self.mininterval = mininterval
+        self.miniters = max(1, int(miniters))
+        self.adaptive = adaptive
+        self.max_overhead = max_overhead
+        self._last_display_time = None
+        self._last_display_idx = 0
+        self._render_cost = 0.0  # EMA of seconds spent in _display()
+        self._cache_key = None
+        self._cache = None
+        
+        # Background rendering
+        self.asynchronous = asynchronous
+        self.refresh_rate = refresh_rate
+        self._render_thread = None
+        self._render_stop = threading.Event()
+        
+        # Set by BarGroup.add() when another object owns the terminal
+        self._group = None
+        
+        # Metrics sink
+        self.writer = writer
+        self._tags = {name: f"{writer_prefix}/{name}" if writer_prefix else name
+                      for name in ('loss', 'it_per_sec', 'samples_per_sec', 'eta')}
+        self._global_step = 0
+        
+        if dataloader is None:
+            # Manual mode: time runs from creation, not from the first update()
+            self._estimator.update(0)
+        
     def __len__(self):
-        return len(self.dataloader)
+        if self._total is None:
+            raise TypeError("Bar over an iterable of unknown length has no len()")
+        return self._total
     
     def __iter__(self):
+        if self.iterator is None:
+            self._start_iteration()
         return self
     
+    def _start_iteration(self):
+        """Create a fresh iterator, e.g. for the next epoch over a dataloader"""
+        if self.status != ProgressBarStatus.TRAINING:
+            # Previous pass finished; start a new one
+            self.status = ProgressBarStatus.TRAINING
+            self._completed_naturally = False
+            self._start_time = time.time()
+            self._reset()
+        self._finalized = False
+        if self.dataloader is None:
+            raise TypeError("Bar without an iterable is advanced with update()")
+        self.iterator = iter(self.dataloader)
+    
     def __next__(self):
-        if len(self._time) < 2:
-            self._time.append(time.time())
-        
-        self._batch_idx += self.batch_size
-        if self._batch_idx > len(self.dataset):
-            self._batch_idx = len(self.dataset)
+        if self.iterator is None:
+            self._start_iteration()
+        self._estimator.update()
         
         try:
             batch = next(self.iterator)
-            self._display()
         except StopIteration:
             # Natural completion
+            self.iterator = None
             self._completed_naturally = True
             self.status = ProgressBarStatus.COMPLETED
             self._display_final()
@@ -90,26 +296,116 @@ class Bar(object):
             self._display_final()
             raise e
         
+        self._batch_idx += self._step
+        if self._dataset_len is not None and self._batch_idx > self._dataset_len:
+            self._batch_idx = self._dataset_len
+        
+        if self.asynchronous:
+            if self._render_thread is None:
+                self._start_renderer()
+        else:
+            self._maybe_display()
+        
         self._idx += 1
-        if self._idx >= len(self.dataloader):
+        if self.writer is not None:
+            self._log_step()
+        if self._total is not None and self._idx >= self._total:
+            # Counters are kept for the final line and reset by the next pass
             self._completed_naturally = True
             self.status = ProgressBarStatus.COMPLETED
-            self._reset()
         
         return batch
     
+    def update(self, n=1):
+        """Advance a manual bar by `n` units (items, bytes, records, ...)"""
+        self._estimator.update(n)
+        self._idx += n
+        self._batch_idx += n
+        if self.writer is not None:
+            self._log_step()
+        if self.asynchronous:
+            if self._render_thread is None:
+                self._start_renderer()
+        else:
+            self._maybe_display()
+    
+    def _log_step(self):
+        """Hand this step's metrics to the writer as one buffered record"""
+        self._global_step += 1
+        tags = self._tags
+        rate = self._estimator.rate
+        eta = None if self._total is None else self._estimator.eta(self._total - self._idx)
+        scalars = {tags['it_per_sec']: rate, tags['samples_per_sec']: rate * self.batch_size}
+        if self.last_loss is not None:
+            scalars[tags['loss']] = self.last_loss
+        if eta is not None:
+            scalars[tags['eta']] = eta
+        self.writer.add_scalars(scalars, self._global_step)
+    
+    def reset(self, total=None):
+        """Start a new pass: clear counters, rate and status and set `total`
+        
+        Lets one manual bar (``Bar(None, ...)``) track several transfers, e.g.
+        one file after another. An iterating bar restarts its iterable on the
+        next ``for`` loop.
+        """
+        self._stop_renderer()
+        self.status = ProgressBarStatus.TRAINING
+        self._completed_naturally = False
+        self._finalized = False
+        self._start_time = time.time()
+        self._reset()
+        self.set_total(total)
+        if self.dataloader is None:
+            self._estimator.update(0)
+        else:
+            self.iterator = None
+    
+    def set_total(self, total):
+        """Change the total (None for unknown), e.g. once a file size is known"""
+        self._total = total
+        if self._step == 1:
+            self._dataset_len = total
+        self._cache_key = None
+    
+    def wrap_file(self, fileobj):
+        """Return `fileobj` wrapped so that reads and writes advance this bar"""
+        return ProgressFile(fileobj, self)
+    
     def update_loss(self, loss_value):
         """Update current loss to display in the progress bar"""
         self.last_loss = loss_value
     
+    def stats(self):
+        """Return current throughput statistics for the running epoch
+        
+        Keys: ``n`` (batches done), ``total`` (None if unknown),
+        ``it_per_sec``, ``samples_per_sec``, ``eta`` (seconds, None while
+        unknown) and
+        ``elapsed`` (seconds since the bar was created).
+        """
+        it_per_sec = self._estimator.rate
+        return {
+            'n': self._idx,
+            'total': self._total,
+            'it_per_sec': it_per_sec,
+            'samples_per_sec': it_per_sec * self.batch_size,
+            'eta': None if self._total is None else self._estimator.eta(self._total - self._idx),
+            'elapsed': time.time() - self._start_time,
+        }
+    
     def mark_completed(self):
         """Manually mark as completed (for successful finish)"""
+        if self._finalized:
+            return
         self.status = ProgressBarStatus.COMPLETED
         self._completed_naturally = True
         self._display_final()
     
     def mark_interrupted(self):
         """Manually mark as interrupted (for error/cancellation)"""
+        if self._finalized:
+            return
         self.status = ProgressBarStatus.INTERRUPTED
         self._display_final()
     
@@ -144,56 +440,173 @@ class Bar(object):
                 'stats_color': Colors.BOLD
             }
     
-    def _display(self):
-        if len(self._time) > 1:
-            t = (self._time[-1] - self._time[-2])
-            eta = t * (len(self.dataloader) - self._idx)
+    def _should_display(self, now):
+        """Decide whether enough time / iterations passed since the last redraw"""
+        if self._last_display_time is None:
+            return True
+        if self._idx - self._last_display_idx < self.miniters:
+            return False
+        interval = self.mininterval
+        if self.adaptive and self.max_overhead > 0:
+            # Space redraws so that render cost / elapsed stays under max_overhead
+            interval = max(interval, self._render_cost / self.max_overhead)
+        return now - self._last_display_time >= interval
+    
+    def _maybe_display(self):
+        """Redraw only when the redraw policy allows it"""
+        now = time.perf_counter()
+        if not self._should_display(now):
+            return
+        self._display()
+        end = time.perf_counter()
+        cost = end - now
+        if self._render_cost:
+            self._render_cost = 0.8 * self._render_cost + 0.2 * cost
         else:
-            eta = 0
-        
-        rate = self._idx / len(self.dataloader)
-        percentage = int(rate * 100)
-        len_bar = int(rate * self._DISPLAY_LENGTH)
-        
-        # Get status-based colors
-        colors = self._get_status_colors()
-        
-        # Use thinner characters for a more compact display
-        bar_fill = '━' * len_bar  # Horizontal line instead of block
-        bar_empty = '╌' * (self._DISPLAY_LENGTH - len_bar)  # Dotted line instead of block
-        
-        idx = str(self._batch_idx).rjust(len(str(len(self.dataset))), ' ')
-        
-        # Format with status-based colors
-        prefix = f"{colors['desc_color']}{self.desc}{Colors.ENDC}"
-        progress = f"{colors['bar_color']}{bar_fill}{bar_empty}{Colors.ENDC}"
-        stats = f"{colors['stats_color']}{percentage:3d}%{Colors.ENDC}"
-        
-        # Add loss display if available
+            self._render_cost = cost
+        self._last_display_time = end
+        self._last_display_idx = self._idx
+    
+    def _render_cache(self):
+        """Return the static render pieces, rebuilding them on status/desc change"""
+        key = (self.status, self.desc, self.compact)
+        if self._cache_key != key:
+            colors = self._get_status_colors()
+            total = self._dataset_len
+            bar_color = colors['bar_color']
+            stats_color = colors['stats_color']
+            prefix = f"\r{colors['desc_color']}{self.desc}{Colors.ENDC}"
+            self._cache = {
+                'colors': colors,
+                'desc': prefix,
+                'prefix': prefix + (" " if self.compact else ": |"),
+                'width': 0 if total is None else len(str(total)),
+                'total': "" if total is None else f"/{total}",
+                # One entry per possible bar length / percentage
+                'bars': [f"{bar_color}{'━' * n}{'╌' * (self._DISPLAY_LENGTH - n)}{Colors.ENDC}"
+                         for n in range(self._DISPLAY_LENGTH + 1)],
+                'stats': [f"{stats_color}{p:3d}%{Colors.ENDC}" for p in range(101)],
+                'time_color': colors['time_color'],
+            }
+            self._cache_key = key
+        return self._cache
+    
+    def _display_loss(self):
+        """Loss value shown on the line (None hides it)"""
+        return self.last_loss
+    
+    def _render(self, batch_idx, percentage, len_bar, seconds, suffix="", final=False):
+        """Assemble one progress line from cached pieces"""
+        cache = self._render_cache()
+        if self.unit_scale:
+            binary = self.unit == 'B'
+            unit = self.unit or ""
+            idx = _scale_units(batch_idx, unit, binary)
+            total = "" if self._dataset_len is None else "/" + _scale_units(self._dataset_len, unit, binary)
+        else:
+            idx = str(batch_idx).rjust(cache['width'])
+            total = cache['total']
+        rate_display = ""
+        if self.unit is not None or self._total is None:
+            rate = self._estimator.rate * self._step
+            if final and seconds:
+                rate = batch_idx / seconds  # Average over the whole run
+        if self.unit is not None:
+            if self.unit_scale:
+                rate_display = f" {_scale_units(rate, self.unit, self.unit == 'B')}/s"
+            else:
+                sep = " " if len(self.unit) > 2 else ""
+                rate_display = f" {rate:.1f}{sep}{self.unit}/s"
+        time_display = f"{cache['time_color']}{seconds:.1f}s{Colors.ENDC}"
+        loss = self._display_loss()
         loss_display = ""
-        if self.last_loss is not None:
-            loss_display = f" {Colors.YELLOW}loss:{self.last_loss:.4f}{Colors.ENDC}"
-        
-        # Time display with green color
-        time_display = f"{colors['time_color']}{eta:.1f}s{Colors.ENDC}"
+        if loss is not None:
+            loss_display = f" {Colors.YELLOW}loss:{loss:.4f}{Colors.ENDC}"
         
-        # Compact display in a single line
-        if self.compact:
-            tmpl = f"\r{prefix} {stats} {idx}/{len(self.dataset)} [{progress}] {time_display}{loss_display}"
+        if self._total is None:
+            # Unknown length: count, rate and elapsed time only
+            if self.unit is None:
+                if final and seconds:
+                    rate = self._idx / seconds
+                rate_display = f" {rate:.1f}it/s"
+            parts = (cache['desc'], " " if self.compact else ": ", idx,
+                     cache['colors']['stats_color'], rate_display, Colors.ENDC, " ",
+                     time_display, loss_display, suffix)
+        elif self.compact:
+            parts = (cache['prefix'], cache['stats'][percentage], " ", idx, total,
+                     " [", cache['bars'][len_bar], "] ", time_display, rate_display,
+                     loss_display, suffix)
         else:
-            # Original multi-component display
-            time_info = f"ETA: {time_display}"
-            tmpl = f"\r{prefix}: |{progress}| {stats} {idx}/{len(self.dataset)} {time_info}{loss_display}"
+            label = " Total: " if final else " ETA: "
+            parts = (cache['prefix'], cache['bars'][len_bar], "| ", cache['stats'][percentage],
+                     " ", idx, total, label, time_display, rate_display, loss_display, suffix)
+        return "".join(parts)
+    
+    def _start_renderer(self):
+        """Start the daemon thread that redraws at `refresh_rate`"""
+        self._render_stop = threading.Event()
+        # The thread only holds a weak reference, so an abandoned bar can be collected
+        self._render_thread = threading.Thread(target=self._render_loop,
+                                               args=(weakref.ref(self), self._render_stop,
+                                                     1.0 / self.refresh_rate),
+                                               name="stylish-progress-render",
+                                               daemon=True)
+        self._render_thread.start()
+    
+    @staticmethod
+    def _render_loop(ref, stop, interval):
+        last_idx = None
+        while not stop.wait(interval):
+            bar = ref()
+            if bar is None:
+                return
+            idx = bar._idx
+            if idx != last_idx:
+                bar._display()
+                last_idx = idx
+            del bar
+    
+    def _stop_renderer(self):
+        """Stop and join the render thread so no redraw can follow the final line"""
+        thread = self._render_thread
+        if thread is None:
+            return
+        self._render_stop.set()
+        thread.join()
+        self._render_thread = None
+    
+    def close(self):
+        """Stop background rendering without drawing a final line"""
+        self._stop_renderer()
+    
+    def __del__(self):
+        # May run on the render thread itself, so only signal it
+        stop = getattr(self, '_render_stop', None)
+        if stop is not None:
+            stop.set()
+    
+    def _display(self):
+        if self._total is None:
+            tmpl = self._render(self._batch_idx, 0, 0, time.time() - self._start_time)
+            self._write(tmpl)
+            return
         
-        sys.stdout.write(tmpl)
-        sys.stdout.flush()
+        eta = self._estimator.eta(self._total - self._idx) or 0
+        
+        rate = min(self._idx / self._total, 1.0) if self._total else 1.0
+        tmpl = self._render(self._batch_idx, int(rate * 100), int(rate * self._DISPLAY_LENGTH), eta)
+        
+        self._write(tmpl)
         
         # Don't print newline here - let _display_final handle it
     
     def _display_final(self):
-        """Display final status with appropriate colors"""
+        """Display final status with appropriate colors (once per pass)"""
+        self._stop_renderer()
+        if self._finalized:
+            return
+        self._finalized = True
         total_time = time.time() - self._start_time
-        colors = self._get_status_colors()
         
         # Calculate final percentage
         if self.status == ProgressBarStatus.COMPLETED:
@@ -201,54 +614,44 @@ class Bar(object):
             len_bar = self._DISPLAY_LENGTH
             status_text = "COMPLETED"
             status_icon = "✓"
+            batch_idx = self._batch_idx
         else:
-            rate = self._idx / len(self.dataloader)
+            rate = min(self._idx / self._total, 1.0) if self._total else 0.0
             percentage = int(rate * 100)
             len_bar = int(rate * self._DISPLAY_LENGTH)
             status_text = "INTERRUPTED"
             status_icon = "✗"
+            batch_idx = self._batch_idx
         
-        # Create final progress bar
-        bar_fill = '━' * len_bar
-        bar_empty = '╌' * (self._DISPLAY_LENGTH - len_bar)
-        
-        idx = str(self._batch_idx).rjust(len(str(len(self.dataset))), ' ')
-        
-        # Format final display
-        prefix = f"{colors['desc_color']}{self.desc}{Colors.ENDC}"
-        progress = f"{colors['bar_color']}{bar_fill}{bar_empty}{Colors.ENDC}"
-        stats = f"{colors['stats_color']}{percentage:3d}%{Colors.ENDC}"
-        
-        # Add loss display if available
-        loss_display = ""
-        if self.last_loss is not None:
-            loss_display = f" {Colors.YELLOW}loss:{self.last_loss:.4f}{Colors.ENDC}"
-        
-        # Final time display
-        time_display = f"{colors['time_color']}{total_time:.1f}s{Colors.ENDC}"
-        status_display = f"{colors['desc_color']}{status_icon} {status_text}{Colors.ENDC}"
-        
-        # Final display line
-        if self.compact:
-            tmpl = f"\r{prefix} {stats} {idx}/{len(self.dataset)} [{progress}] {time_display}{loss_display} {status_display}"
-        else:
-            tmpl = f"\r{prefix}: |{progress}| {stats} {idx}/{len(self.dataset)} Total: {time_display}{loss_display} {status_display}"
+        colors = self._render_cache()['colors']
+        status_display = f" {colors['desc_color']}{status_icon} {status_text}{Colors.ENDC}"
+        tmpl = self._render(batch_idx, percentage, len_bar, total_time, status_display, final=True)
         
-        sys.stdout.write(tmpl)
+        self._write(tmpl, final=True)
+    
+    def _write(self, line, final=False):
+        """Send a rendered line to the owning BarGroup, or straight to stdout"""
+        if self._group is not None:
+            self._group.update(self, line, final)
+            return
+        sys.stdout.write(line)
         sys.stdout.flush()
-        print()  # Add newline after final display
+        if final:
+            print()  # Add newline after final display
     
     def _reset(self):
         self._idx = 0
         self._batch_idx = 0
-        self._time = []
+        self._estimator.reset()
+        self._last_display_time = None
+        self._last_display_idx = 0
 
 # Enhanced Bar for training with context manager support
 class TrainingBar(Bar):
     """Enhanced Bar with context manager support for training loops"""
     
-    def __init__(self, dataloader, desc="Training", color=Colors.CYAN):
-        super().__init__(dataloader, desc, color)
+    def __init__(self, dataloader, desc="Training", color=Colors.CYAN, **kwargs):
+        super().__init__(dataloader, desc, color, **kwargs)
         self.epoch = 1
         self.total_epochs = None
     
@@ -267,6 +670,7 @@ class TrainingBar(Bar):
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit - handle different exit scenarios"""
+        # mark_completed / mark_interrupted join the render thread before drawing
         if exc_type is None:
             # Normal completion
             self.mark_completed()
@@ -278,3 +682,260 @@ class TrainingBar(Bar):
             # Other exceptions
             self.mark_interrupted()
             return False  # Re-raise the exception
+
+
+class ProgressFile(object):
+    """File-like wrapper that advances a Bar by the bytes read or written.
+    
+    Data is passed straight through to the wrapped file; ``readinto`` fills
+    the caller's buffer in place. All other attributes (``seek``, ``tell``,
+    ``flush``, ...) are delegated, so the wrapper can be handed to
+    ``np.savez``, ``np.load``, ``shutil.copyfileobj`` and similar APIs.
+    """
+    
+    def __init__(self, fileobj, bar):
+        self._fileobj = fileobj
+        self._bar = bar
+    
+    def read(self, *args):
+        data = self._fileobj.read(*args)
+        self._bar.update(len(data))
+        return data
+    
+    def read1(self, *args):
+        data = self._fileobj.read1(*args)
+        self._bar.update(len(data))
+        return data
+    
+    def readinto(self, buffer):
+        n = self._fileobj.readinto(buffer)
+        if n:
+            self._bar.update(n)
+        return n
+    
+    def readline(self, *args):
+        line = self._fileobj.readline(*args)
+        self._bar.update(len(line))
+        return line
+    
+    def write(self, data):
+        n = self._fileobj.write(data)
+        if n is None:
+            n = memoryview(data).nbytes if not isinstance(data, str) else len(data)
+        self._bar.update(n)
+        return n
+    
+    def __iter__(self):
+        for line in self._fileobj:
+            self._bar.update(len(line))
+            yield line
+    
+    def __getattr__(self, name):
+        return getattr(self._fileobj, name)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._fileobj.close()
+        return False
+
+
+class JSONLBackend(object):
+    """Writer backend appending one JSON object per record to ``scalars.jsonl``"""
+    
+    def __init__(self, logdir, filename='scalars.jsonl'):
+        import json
+        self._dumps = json.dumps
+        os.makedirs(logdir, exist_ok=True)
+        self._file = open(os.path.join(logdir, filename), 'a', encoding='utf-8')
+    
+    def write(self, records):
+        lines = []
+        for step, wall_time, scalars in records:
+            row = {'step': step, 'wall_time': wall_time}
+            row.update((tag, float(value)) for tag, value in scalars.items())
+            lines.append(self._dumps(row))
+        self._file.write('\n'.join(lines) + '\n')
+    
+    def flush(self):
+        self._file.flush()
+    
+    def close(self):
+        self._file.close()
+
+
+class CSVBackend(object):
+    """Writer backend appending ``tag,value,step,wall_time`` rows to ``scalars.csv``"""
+    
+    def __init__(self, logdir, filename='scalars.csv'):
+        import csv
+        os.makedirs(logdir, exist_ok=True)
+        path = os.path.join(logdir, filename)
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'a', encoding='utf-8', newline='')
+        self._csv = csv.writer(self._file)
+        if is_new:
+            self._csv.writerow(['tag', 'value', 'step', 'wall_time'])
+    
+    def write(self, records):
+        self._csv.writerows((tag, float(value), step, wall_time)
+                            for step, wall_time, scalars in records
+                            for tag, value in scalars.items())
+    
+    def flush(self):
+        self._file.flush()
+    
+    def close(self):
+        self._file.close()
+
+
+class TensorBoardBackend(object):
+    """Writer backend forwarding scalars to TensorBoard (imported on first use)"""
+    
+    def __init__(self, logdir):
+        try:
+            from torch.utils.tensorboard import SummaryWriter
+        except ImportError as e:
+            raise ImportError('TensorBoard backend requires `torch` and `tensorboard`.') from e
+        self._writer = SummaryWriter(logdir)
+    
+    def write(self, records):
+        for step, wall_time, scalars in records:
+            for tag, value in scalars.items():
+                self._writer.add_scalar(tag, float(value), step, walltime=wall_time)
+    
+    def flush(self):
+        self._writer.flush()
+    
+    def close(self):
+        self._writer.close()
+
+
+_BACKENDS = {
+    'jsonl': JSONLBackend,
+    'csv': CSVBackend,
+    'tensorboard': TensorBoardBackend,
+}
+
+
+class Writer(object):
+    """Buffered metrics writer for training logs.
+    
+    ``add_scalar`` / ``add_scalars`` only append one record to an in-memory
+    buffer; a daemon thread hands the buffered records to the backends every
+    ``flush_interval`` seconds, so logging never does file I/O on the
+    training thread. Values are converted with ``float()`` when flushed;
+    values that cannot be converted and backends that fail are skipped with a
+    warning, so one bad record never stops the flush thread.
+    
+    ``backend`` is ``'jsonl'`` (default), ``'csv'``, ``'tensorboard'``, a
+    backend object with ``write(records)``, ``flush()`` and ``close()``, or a
+    list of those. Call :meth:`close` (or use ``with``) to flush the rest;
+    open writers are also closed at interpreter exit.
+    """
+    
+    def __init__(self, logdir, backend='jsonl', flush_interval=1.0):
+        self.logdir = logdir
+        self.flush_interval = flush_interval
+        if isinstance(backend, (list, tuple)):
+            backends = backend
+        else:
+            backends = [backend]
+        self._backends = [_BACKENDS[b](logdir) if isinstance(b, str) else b for b in backends]
+        
+        # deque append/popleft are atomic, so producers never take a lock
+        self._buffer = deque()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop,
+                                        name="stylish-progress-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        
+        self.epoch = 0
+        self.best_metric = float('inf')
+    
+    def add_scalar(self, tag, value, step=None, wall_time=None):
+        """Buffer one scalar"""
+        self._buffer.append((step, wall_time or time.time(), {tag: value}))
+    
+    def add_scalars(self, scalars, step=None, wall_time=None):
+        """Buffer several scalars of the same step as one record"""
+        self._buffer.append((step, wall_time or time.time(), scalars))
+    
+    def flush(self):
+        """Write all buffered records to the backends now"""
+        with self._flush_lock:
+            buffer = self._buffer
+            records = []
+            while True:
+                try:
+                    records.append(buffer.popleft())
+                except IndexError:
+                    break
+            records = [record for record in map(self._convert, records) if record[2]]
+            if not records:
+                return
+            for backend in self._backends:
+                try:
+                    backend.write(records)
+                    backend.flush()
+                except Exception as e:
+                    warnings.warn(f"Writer backend {type(backend).__name__} failed: {e!r}",
+                                  RuntimeWarning)
+    
+    @staticmethod
+    def _convert(record):
+        """Return `record` with its values as floats, dropping those that do not convert"""
+        step, wall_time, scalars = record
+        converted = {}
+        for tag, value in scalars.items():
+            try:
+                converted[tag] = float(value)
+            except (TypeError, ValueError) as e:
+                warnings.warn(f"Writer dropped {tag!r} at step {step}: {e}", RuntimeWarning)
+        return step, wall_time, converted
+    
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+    
+    def close(self):
+        """Stop the flush thread, write remaining records and close backends"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+        for backend in self._backends:
+            backend.close()
+        atexit.unregister(self.close)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+    
+    def log_train_loss(self, loss_type, train_loss, step):
+        """Log training loss with colorful output"""
+        self.add_scalar(f'train_{loss_type}_loss', train_loss, step)
+        print(f"{Colors.BOLD}Train {loss_type} Loss:{Colors.ENDC} {Colors.GREEN}{train_loss:.6f}{Colors.ENDC}")
+    
+    def log_valid_loss(self, loss_type, valid_loss, step):
+        """Log validation loss with colorful output"""
+        self.add_scalar(f'valid_{loss_type}_loss', valid_loss, step)
+        print(f"{Colors.BOLD}Valid {loss_type} Loss:{Colors.ENDC} {Colors.BLUE}{valid_loss:.6f}{Colors.ENDC}")
+    
+    def log_score(self, metrics_name, metrics, step):
+        """Log metrics with colorful output; returns True for a new best validation loss"""
+        self.add_scalar(metrics_name, metrics, step)
+        print(f"{Colors.BOLD}{metrics_name}:{Colors.ENDC} {Colors.CYAN}{metrics:.6f}{Colors.ENDC}")
+        
+        # Track best metrics for saving checkpoints
+        if metrics_name == 'validation_loss' and metrics < self.best_metric:
+            self.best_metric = metrics
+            return True
+        return False
@@ -0,0 +1,258 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+from .display import Colors, ProgressBarStatus, TrainingBar
+
+
+def _default_address():
+    """Socket address shared by all local ranks of one launch"""
+    run_id = os.environ.get('TORCHELASTIC_RUN_ID') or os.environ.get('MASTER_PORT', '0')
+    name = f"stylish-progress-{run_id}"
+    if sys.platform == 'win32':
+        return rf"\\.\pipe\{name}"
+    return os.path.join(tempfile.gettempdir(), f"{name}.sock")
+
+
+class DistributedBar(TrainingBar):
+    """TrainingBar that aggregates progress of all local ranks on rank 0.
+
+    Ranks other than 0 never draw. They send their counters, loss and timing
+    to rank 0 over a local socket (a Unix domain socket, or a named pipe on
+    Windows) at most every ``sync_interval`` seconds. Rank 0 draws a single
+    line with the combined progress, the aggregate samples/s, the ETA of the
+    slowest rank and the ranks running below ``straggler_ratio`` of the
+    median rate.
+
+    States are tagged with the pass (epoch) they belong to, so a bar reused
+    over several epochs only combines states of the pass it is drawing.
+
+    ``rank`` and ``world_size`` default to the ``RANK`` / ``WORLD_SIZE``
+    variables set by torchrun. All ranks must run on the same host and use
+    the same ``address``.
+    """
+    
+    def __init__(self, dataloader, desc="Training", color=Colors.CYAN,
+                 rank=None, world_size=None, address=None, authkey=None,
+                 sync_interval=0.5, straggler_ratio=0.8,
+                 connect_timeout=30.0, final_timeout=5.0, **kwargs):
+        kwargs.setdefault('mininterval', sync_interval)
+        super().__init__(dataloader, desc, color, **kwargs)
+        if self._total is None:
+            raise ValueError('DistributedBar needs an iterable with a known length or `total`.')
+        self.rank = int(os.environ.get('RANK', 0)) if rank is None else rank
+        self.world_size = int(os.environ.get('WORLD_SIZE', 1)) if world_size is None else world_size
+        self.address = address or _default_address()
+        self.straggler_ratio = straggler_ratio
+        self.final_timeout = final_timeout
+        
+        self._listener = None
+        self._conn = None
+        self._peers = []
+        self._pass = 0
+        self._rank_states = {}  # Pass -> rank -> last reported state
+        self._state_cond = threading.Condition()
+        
+        if self.world_size > 1:
+            if self.rank == 0:
+                self._listen(authkey)
+            else:
+                self._connect(authkey, connect_timeout)
+    
+    # IPC
+    
+    def _listen(self, authkey):
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)  # Stale socket from a crashed run
+        self._listener = Listener(self.address, authkey=authkey)
+        threading.Thread(target=self._accept_loop, name="stylish-progress-accept",
+                         daemon=True).start()
+    
+    def _accept_loop(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError):
+                return  # Listener closed
+            self._peers.append(conn)
+            threading.Thread(target=self._recv_loop, args=(conn,),
+                             name="stylish-progress-recv", daemon=True).start()
+    
+    def _recv_loop(self, conn):
+        while True:
+            try:
+                state = conn.recv()
+            except (OSError, EOFError):
+                return
+            with self._state_cond:
+                self._rank_states.setdefault(state['pass'], {})[state['rank']] = state
+                self._state_cond.notify_all()
+    
+    def _connect(self, authkey, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self._conn = Client(self.address, authkey=authkey)
+                return
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
+    
+    def _send(self, state):
+        if self._conn is None:
+            return
+        try:
+            self._conn.send(state)
+        except (OSError, EOFError):
+            self._conn = None  # Rank 0 is gone; keep training without a bar
+    
+    def close(self):
+        """Stop rendering and close the IPC channel"""
+        super().close()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+            for conn in self._peers:
+                conn.close()
+            self._peers = []
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            return super().__exit__(exc_type, exc_val, exc_tb)
+        finally:
+            self.close()
+    
+    # State
+    
+    def _start_iteration(self):
+        super()._start_iteration()
+        with self._state_cond:
+            self._pass += 1
+            # States of earlier passes are no longer drawn; later ones may already be here
+            for old in [p for p in self._rank_states if p < self._pass]:
+                del self._rank_states[old]
+    
+    def _pass_states(self):
+        """States the other ranks reported for the current pass (call with _state_cond held)"""
+        return self._rank_states.get(self._pass, {})
+    
+    def _local_state(self):
+        stats = self.stats()
+        if self.status == ProgressBarStatus.COMPLETED:
+            idx, samples = self._total, self._batch_idx
+        else:
+            idx, samples = self._idx, self._batch_idx
+        return {
+            'rank': self.rank,
+            'pass': self._pass,
+            'idx': idx,
+            'total': self._total,
+            'samples': samples,
+            'samples_per_sec': stats['samples_per_sec'],
+            'eta': stats['eta'],
+            'loss': self.last_loss,
+            'status': self.status,
+        }
+    
+    def _all_states(self):
+        with self._state_cond:
+            states = dict(self._pass_states())
+        states[self.rank] = self._local_state()
+        return [states[r] for r in sorted(states)]
+    
+    def rank_stats(self):
+        """Return the last state every rank reported for the current pass (rank 0 only)"""
+        return self._all_states()
+    
+    def _display_loss(self):
+        if self.rank != 0 or self.world_size == 1:
+            return self.last_loss
+        losses = [s['loss'] for s in self._all_states() if s['loss'] is not None]
+        if not losses:
+            return None
+        return sum(losses) / len(losses)
+    
+    def _stragglers(self, states):
+        rates = sorted(s['samples_per_sec'] for s in states if s['samples_per_sec'])
+        if len(rates) < 2:
+            return []
+        median = rates[len(rates) // 2]
+        return [s['rank'] for s in states
+                if s['status'] == ProgressBarStatus.TRAINING
+                and s['samples_per_sec'] < self.straggler_ratio * median]
+    
+    def _render_aggregate(self, seconds=None, suffix="", final=False):
+        states = self._all_states()
+        done = sum(s['idx'] for s in states)
+        total = sum(s['total'] for s in states) or 1
+        samples = min(sum(s['samples'] for s in states), self._dataset_len)
+        rate = min(done / total, 1.0)
+        if seconds is None:
+            etas = [s['eta'] for s in states if s['eta'] is not None]
+            seconds = max(etas) if etas else 0
+        
+        if final:
+            throughput = samples / seconds if seconds else 0.0  # Average over the run
+        else:
+            throughput = sum(s['samples_per_sec'] for s in states)
+        extra = f" {throughput:.1f} samples/s"
+        if len(states) < self.world_size:
+            extra += f" {Colors.YELLOW}{len(states)}/{self.world_size} ranks{Colors.ENDC}"
+        slow = self._stragglers(states)
+        if slow:
+            extra += f" {Colors.BRIGHT_RED}slow:{','.join(f'r{r}' for r in slow)}{Colors.ENDC}"
+        return self._render(samples, int(rate * 100), int(rate * self._DISPLAY_LENGTH),
+                            seconds, extra + suffix, final)
+    
+    # Drawing
+    
+    def _display(self):
+        if self.world_size == 1:
+            return super()._display()
+        if self.rank != 0:
+            self._send(self._local_state())
+            return
+        self._write(self._render_aggregate())
+    
+    def _wait_for_ranks(self):
+        """Give the other ranks a moment to report their final state"""
+        deadline = time.monotonic() + self.final_timeout
+        with self._state_cond:
+            while True:
+                finished = sum(1 for s in self._pass_states().values()
+                               if s['status'] != ProgressBarStatus.TRAINING)
+                remaining = deadline - time.monotonic()
+                if finished >= self.world_size - 1 or remaining <= 0:
+                    return
+                self._state_cond.wait(remaining)
+    
+    def _display_final(self):
+        if self.world_size == 1:
+            return super()._display_final()
+        self._stop_renderer()
+        if self._finalized:
+            return
+        self._finalized = True
+        if self.rank != 0:
+            self._send(self._local_state())
+            return
+        
+        self._wait_for_ranks()
+        states = self._all_states()
+        if any(s['status'] == ProgressBarStatus.INTERRUPTED for s in states):
+            self.status = ProgressBarStatus.INTERRUPTED
+        colors = self._render_cache()['colors']
+        if self.status == ProgressBarStatus.COMPLETED:
+            status_display = f" {colors['desc_color']}✓ COMPLETED{Colors.ENDC}"
+        else:
+            status_display = f" {colors['desc_color']}✗ INTERRUPTED{Colors.ENDC}"
+        tmpl = self._render_aggregate(time.time() - self._start_time, status_display, final=True)
+        
+        self._write(tmpl, final=True)
@@ -0,0 +1,186 @@
+import sys
+import threading
+
+from .display import Bar
+
+# ANSI cursor control
+_CLEAR_LINE = '\033[K'
+_CURSOR_UP = '\033[{}A'
+
+
+class BarGroup(object):
+    """Owns the terminal and draws several bars on fixed rows.
+    
+    Bars added to the group no longer write to stdout themselves; they hand
+    their rendered line to the group, which redraws every row in a single
+    write ``refresh_rate`` times per second. Updates may come from any
+    thread.
+    
+    Rows keep the order in which bars were added. A bar added with a
+    ``parent`` is placed below the parent and its existing children, so an
+    epoch bar, its batch bar and an eval bar stay grouped together. When a
+    bar finishes, its final line is written once above the live rows if
+    ``leave`` is true (default for top-level bars) and dropped otherwise
+    (default for nested bars); either way its row is released, so the live
+    region only holds running bars.
+    
+    Usage::
+        
+        with BarGroup() as group:
+            for epoch in range(num_epochs):
+                train_bar = group.bar(train_loader, desc=f"Epoch {epoch + 1}")
+                for batch in train_bar:
+                    ...
+            # Concurrent bars, e.g. from an eval thread, get their own row
+            valid_bar = group.bar(valid_loader, desc="Valid")
+    """
+    
+    def __init__(self, refresh_rate=10, stream=None):
+        self.refresh_rate = refresh_rate
+        self.stream = stream
+        self._lock = threading.RLock()
+        self._rows = []      # Bars in display order
+        self._lines = {}     # Bar -> latest rendered line
+        self._parents = {}   # Bar -> parent Bar or None
+        self._leave = {}     # Bar -> keep row after finishing
+        self._dirty = False
+        self._drawn_rows = 0
+        self._thread = None
+        self._stop = threading.Event()
+    
+    def add(self, bar, parent=None, leave=None):
+        """Attach `bar` to the group and return its row position"""
+        with self._lock:
+            if parent is None or parent not in self._parents:
+                # Finished parents have left the live rows
+                position = len(self._rows)
+            else:
+                position = self._rows.index(parent) + 1
+                while (position < len(self._rows)
+                       and self._is_descendant(self._rows[position], parent)):
+                    position += 1
+            self._rows.insert(position, bar)
+            self._parents[bar] = parent
+            self._leave[bar] = parent is None if leave is None else leave
+            self._lines[bar] = ""
+            bar._group = self
+        self.start()
+        return position
+    
+    def bar(self, iterable, parent=None, leave=None, bar_cls=Bar, **kwargs):
+        """Create a bar of type `bar_cls` and add it to the group"""
+        bar = bar_cls(iterable, **kwargs)
+        self.add(bar, parent=parent, leave=leave)
+        return bar
+    
+    def remove(self, bar):
+        """Detach `bar` and release its row"""
+        with self._lock:
+            if bar not in self._parents:
+                return
+            self._rows.remove(bar)
+            del self._lines[bar], self._parents[bar], self._leave[bar]
+            bar._group = None
+            self._dirty = True
+    
+    def position(self, bar):
+        """Current row of `bar` (0 is the top row of the group)"""
+        with self._lock:
+            return self._rows.index(bar)
+    
+    def _is_descendant(self, bar, ancestor):
+        parent = self._parents.get(bar)
+        while parent is not None:
+            if parent is ancestor:
+                return True
+            parent = self._parents.get(parent)
+        return False
+    
+    def update(self, bar, line, final=False):
+        """Store the latest line of `bar`; drawn on the next refresh tick"""
+        with self._lock:
+            if bar not in self._lines:
+                return
+            self._lines[bar] = line.lstrip('\r')
+            self._dirty = True
+            if final:
+                if self._leave[bar]:
+                    self._write_above(bar)
+                else:
+                    self.refresh()
+                    self.remove(bar)
+    
+    def _write_above(self, bar):
+        """Print the final line of `bar` above the live rows and release its row"""
+        line = self._lines[bar]
+        self.remove(bar)
+        stream = self.stream or sys.stdout
+        # The cursor sits on the top row; the line takes it over for good
+        stream.write(f"\r{line}{_CLEAR_LINE}\n")
+        self._drawn_rows = max(self._drawn_rows - 1, 0)
+        self.refresh()
+    
+    # Drawing
+    
+    def refresh(self):
+        """Redraw all rows with one write, leaving the cursor on the top row"""
+        with self._lock:
+            if not self._dirty:
+                return
+            lines = [self._lines[bar] for bar in self._rows]
+            # Blank rows left over from released bars
+            lines += [""] * (self._drawn_rows - len(lines))
+            if not lines:
+                return
+            out = "\n".join(f"\r{line}{_CLEAR_LINE}" for line in lines)
+            if len(lines) > 1:
+                out += _CURSOR_UP.format(len(lines) - 1)
+            out += "\r"
+            stream = self.stream or sys.stdout
+            stream.write(out)
+            stream.flush()
+            self._drawn_rows = len(self._rows)
+            self._dirty = False
+    
+    def _refresh_loop(self):
+        interval = 1.0 / self.refresh_rate
+        while not self._stop.wait(interval):
+            self.refresh()
+    
+    def start(self):
+        """Start the refresh thread (called automatically by add())"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._refresh_loop,
+                                            name="stylish-progress-group",
+                                            daemon=True)
+            self._thread.start()
+    
+    def close(self):
+        """Stop refreshing, draw the last state and move below the group"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+        with self._lock:
+            for bar in list(self._rows):
+                bar.close()
+            self._dirty = True
+            self.refresh()
+            if self._drawn_rows:
+                stream = self.stream or sys.stdout
+                stream.write("\n" * self._drawn_rows)
+                stream.flush()
+            for bar in list(self._rows):
+                self.remove(bar)
+            self._drawn_rows = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
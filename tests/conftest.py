@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Run the tests against the checkout, like the benchmarks do
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
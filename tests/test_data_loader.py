@@ -0,0 +1,28 @@
+import contextlib
+import io
+import re
+
+import numpy as np
+import pytest
+
+from stylish_progress import Bar
+from utils.data_loader import save_segments
+
+
+@pytest.mark.parametrize('format', ['npz', 'store'])
+def test_save_segments_reuses_bar_per_call(tmp_path, format):
+    segments = np.random.rand(200, 294).astype(np.float32)
+    labels = np.arange(200)
+    bar = Bar(None, desc="Save", unit='B', unit_scale=True)
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        for name in ('a', 'b'):
+            path = tmp_path / (name if format == 'npz' else 'store')
+            save_segments(segments, labels, path, bar=bar, format=format)
+    finals = [line for line in out.getvalue().split('\n') if 'COMPLETED' in line]
+    assert len(finals) == 2
+    for line in finals:
+        # Done/total of one call, and they match once the headers are counted
+        done, total = re.search(r'([\d.]+KiB)/([\d.]+KiB)', line).groups()
+        assert done == total
+    assert bar.stats()['n'] < 2 * (segments.nbytes + labels.nbytes)
@@ -0,0 +1,50 @@
+import contextlib
+import gc
+import io
+import threading
+import time
+
+from stylish_progress import Bar
+
+
+def render_threads():
+    return [t for t in threading.enumerate() if t.name == "stylish-progress-render"]
+
+
+def test_break_out_of_async_bar_does_not_leak_render_thread():
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        for _ in range(5):
+            for i in Bar(range(100), asynchronous=True, refresh_rate=100):
+                if i == 10:
+                    break
+        gc.collect()
+        time.sleep(0.05)
+    assert render_threads() == []
+    written = len(out.getvalue())
+    time.sleep(0.05)
+    assert len(out.getvalue()) == written
+
+
+def test_close_stops_render_thread_of_abandoned_pass():
+    bar = Bar(range(100), asynchronous=True, refresh_rate=100)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in bar:
+            if i == 10:
+                break
+        assert len(render_threads()) == 1
+        bar.close()
+    assert render_threads() == []
+
+
+def test_reset_reuses_finished_manual_bar():
+    out = io.StringIO()
+    bar = Bar(None, desc="Copy", total=10, unit='B')
+    with contextlib.redirect_stdout(out):
+        for _ in range(2):
+            bar.update(10)
+            bar.mark_completed()
+            bar.reset(total=20)
+        bar.update(5)
+    assert out.getvalue().count("COMPLETED") == 2
+    assert bar.stats()['n'] == 5 and bar.stats()['total'] == 20
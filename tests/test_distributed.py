@@ -0,0 +1,99 @@
+import contextlib
+import io
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+from stylish_progress.display import ProgressBarStatus
+from stylish_progress.distributed import DistributedBar
+
+WORLD_SIZE = 4
+DATASET_LEN = 1000
+BATCH_SIZE = 10
+EPOCHS = 2
+
+
+class ShardLoader(object):
+    """DataLoader stand-in iterating one rank's shard of a shared dataset"""
+
+    def __init__(self, rank):
+        self.dataset = range(DATASET_LEN)
+        self.batch_size = BATCH_SIZE
+        self._batches = [list(range(i, i + BATCH_SIZE))
+                         for i in range(rank * DATASET_LEN // WORLD_SIZE,
+                                        (rank + 1) * DATASET_LEN // WORLD_SIZE, BATCH_SIZE)]
+
+    def __len__(self):
+        return len(self._batches)
+
+    def __iter__(self):
+        return iter(self._batches)
+
+
+def _run_rank(rank, address, barrier, results):
+    out = io.StringIO()
+    finished_at = []
+    with contextlib.redirect_stdout(out):
+        bar = DistributedBar(ShardLoader(rank), rank=rank, world_size=WORLD_SIZE,
+                             address=address, sync_interval=0.01, final_timeout=10)
+        mid_samples = None
+        with bar:
+            for epoch in range(EPOCHS):
+                for i, _ in enumerate(bar):
+                    if rank == 0 and epoch == 0 and i == len(bar) // 2:
+                        # Wait until every other rank has finished its shard
+                        deadline = time.monotonic() + 10
+                        while time.monotonic() < deadline:
+                            states = bar.rank_stats()
+                            if (len(states) == WORLD_SIZE and all(
+                                    s['status'] == ProgressBarStatus.COMPLETED
+                                    for s in states if s['rank'] != 0)):
+                                break
+                            time.sleep(0.01)
+                        mid_samples = [s['samples'] for s in bar.rank_stats()]
+                    if rank != 0 and i == len(bar) - 1:
+                        # Last batch; the final state is sent after this
+                        finished_at.append(time.monotonic())
+                    # Rank 0 is the fastest rank, so it has to wait for the others
+                    time.sleep(0.001 if rank == 0 else 0.004)
+                if rank == 0:
+                    # After the final line was drawn
+                    finished_at.append(time.monotonic())
+                barrier.wait(timeout=30)
+                if rank != 0:
+                    # Slow start of the next epoch: no state of it reaches rank 0 for a while
+                    time.sleep(0.2)
+    results.put((rank, out.getvalue(), mid_samples, finished_at))
+
+
+def test_ranks_aggregate_on_rank_zero():
+    ctx = mp.get_context('spawn')
+    results = ctx.Queue()
+    barrier = ctx.Barrier(WORLD_SIZE)
+    address = os.path.join(tempfile.mkdtemp(), 'bar.sock')
+    procs = [ctx.Process(target=_run_rank, args=(rank, address, barrier, results))
+             for rank in range(WORLD_SIZE)]
+    for proc in procs:
+        proc.start()
+    outputs = dict((rank, (out, mid, finished)) for rank, out, mid, finished in
+                   (results.get(timeout=60) for _ in procs))
+    for proc in procs:
+        proc.join(timeout=30)
+        assert proc.exitcode == 0
+
+    # Only rank 0 draws, and its final line is drawn once per epoch
+    for rank in range(1, WORLD_SIZE):
+        assert outputs[rank][0] == ""
+    out, mid_samples, finished_at = outputs[0]
+    assert out.count("COMPLETED") == EPOCHS
+
+    # Every epoch's final line waits for that epoch, not the previous one
+    for epoch in range(EPOCHS):
+        assert all(finished_at[epoch] >= outputs[rank][2][epoch]
+                   for rank in range(1, WORLD_SIZE))
+
+    # Finished ranks report their shard, not the whole dataset
+    shard = DATASET_LEN // WORLD_SIZE
+    assert mid_samples[1:] == [shard] * (WORLD_SIZE - 1)
+    assert sum(mid_samples) < DATASET_LEN
@@ -0,0 +1,50 @@
+import io
+import re
+
+from stylish_progress.group import BarGroup
+
+_TOKENS = re.compile(r'\033\[(\d*)([A-Za-z])|(\r)|(\n)|([^\r\n\033]+)')
+
+
+def render(text):
+    """Replay the group's output on a minimal terminal and return its rows"""
+    rows, row, col = [[]], 0, 0
+    for count, code, cr, nl, chars in _TOKENS.findall(text):
+        if code == 'A':
+            row -= int(count or 1)
+        elif code == 'K':
+            del rows[row][col:]
+        elif cr:
+            col = 0
+        elif nl:
+            row, col = row + 1, 0
+            if row == len(rows):
+                rows.append([])
+        elif chars:
+            rows[row][col:col + len(chars)] = chars
+            col += len(chars)
+    return [''.join(r) for r in rows]
+
+
+def test_finished_leave_bars_are_written_once_above_live_rows():
+    stream = io.StringIO()
+    with BarGroup(stream=stream) as group:
+        for epoch in range(5):
+            for _ in group.bar(range(3), desc=f"Epoch{epoch}"):
+                for _ in group.bar(range(2), desc="batch", leave=False):
+                    pass
+            assert group._rows == []
+    screen = render(stream.getvalue())
+    assert [line.split()[0] for line in screen if line] == [f"Epoch{e}" for e in range(5)]
+
+
+def test_leave_bar_finishing_below_a_running_bar():
+    stream = io.StringIO()
+    with BarGroup(stream=stream) as group:
+        outer = group.bar(range(2), desc="Outer")
+        for _ in outer:
+            for _ in group.bar(range(2), desc="Valid", leave=True):
+                pass
+            assert group._rows == [outer]
+    screen = [line.split()[0] for line in render(stream.getvalue()) if line]
+    assert screen == ["Valid", "Valid", "Outer"]
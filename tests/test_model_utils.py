@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from utils.model_utils import BatchPredictor
+
+
+class SumClassifier(object):
+    """입력 세그먼트의 합을 돌려주는 ECGClassifier 대역"""
+    model_type = 'onnx'
+    
+    def _predict_onnx(self, segments):
+        return segments.sum(axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_predict_inside_stream_does_not_overwrite_batch_in_flight(prefetch):
+    engine = BatchPredictor(SumClassifier(), batch_size=4, prefetch=prefetch)
+    a = np.arange(40, dtype=np.float32).reshape(20, 2)
+    b = np.full((20, 2), 1000, dtype=np.float32)
+    outputs = []
+    for out in engine.predict_stream(iter(a)):
+        outputs.append(out)
+        np.testing.assert_array_equal(engine.predict(b), b.sum(axis=1, keepdims=True))
+    np.testing.assert_array_equal(np.concatenate(outputs), a.sum(axis=1, keepdims=True))
+
+
+def test_zipped_streams_keep_their_own_batches():
+    engine = BatchPredictor(SumClassifier(), batch_size=4, prefetch=True)
+    a = np.arange(40, dtype=np.float32).reshape(20, 2)
+    b = -a
+    pairs = list(zip(engine.predict_stream(iter(a)), engine.predict_stream(iter(b))))
+    np.testing.assert_array_equal(np.concatenate([x for x, _ in pairs]), a.sum(axis=1, keepdims=True))
+    np.testing.assert_array_equal(np.concatenate([y for _, y in pairs]), b.sum(axis=1, keepdims=True))
+    assert len(engine._pool) == 2
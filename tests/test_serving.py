@@ -0,0 +1,89 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from utils.serving import InferenceService
+
+
+class SumClassifier:
+    """Stand-in for ECGClassifier: one score per segment"""
+
+    def predict(self, segments, batch_size=None):
+        return segments.reshape(len(segments), -1).sum(axis=1, keepdims=True)
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, timeout=10))
+
+
+def test_coalesces_requests():
+    async def main():
+        async with InferenceService(SumClassifier(), max_wait=0.05) as service:
+            requests = [np.full((i + 1, 4), i, dtype=np.float32) for i in range(5)]
+            outputs = await asyncio.gather(*(service.classify(r) for r in requests))
+            return requests, outputs, service.stats()
+
+    requests, outputs, stats = run(main())
+    for request, output in zip(requests, outputs):
+        np.testing.assert_allclose(output, request.sum(axis=1, keepdims=True))
+    assert stats['requests'] == 5
+    assert stats['batches'] < 5
+
+
+def test_rejects_bare_segment():
+    async def main():
+        async with InferenceService(SumClassifier()) as service:
+            with pytest.raises(ValueError):
+                await service.classify(np.zeros(4))
+
+    run(main())
+
+
+def test_mismatched_shape_fails_only_that_request():
+    async def main():
+        async with InferenceService(SumClassifier(), max_wait=0.05) as service:
+            results = await asyncio.gather(
+                service.classify(np.ones((2, 4))),
+                service.classify(np.ones((1, 5))),
+                return_exceptions=True)
+            # The worker must still serve later requests
+            later = await service.classify(np.ones((3, 4)))
+            return results, later
+
+    (good, bad), later = run(main())
+    np.testing.assert_allclose(good, [[4], [4]])
+    assert not isinstance(good, Exception)
+    np.testing.assert_allclose(bad, [[5]])
+    np.testing.assert_allclose(later, [[4], [4], [4]])
+
+
+def test_odd_shape_does_not_split_the_shared_batch():
+    async def main():
+        async with InferenceService(SumClassifier(), max_wait=0.05) as service:
+            requests = [np.ones((1, 4))] * 8 + [np.ones((1, 5))] + [np.ones((1, 4))] * 8
+            outputs = await asyncio.gather(*(service.classify(r) for r in requests))
+            return outputs, service.stats()
+
+    outputs, stats = run(main())
+    assert [float(o[0, 0]) for o in outputs] == [4.0] * 8 + [5.0] + [4.0] * 8
+    assert stats['batches'] == 2
+
+
+def test_predict_error_is_delivered_and_service_survives():
+    class FlakyClassifier(SumClassifier):
+        calls = 0
+
+        def predict(self, segments, batch_size=None):
+            self.calls += 1
+            if self.calls == 1:
+                raise RuntimeError("boom")
+            return super().predict(segments)
+
+    async def main():
+        async with InferenceService(FlakyClassifier()) as service:
+            with pytest.raises(RuntimeError):
+                await service.classify(np.ones((1, 4)))
+            return await service.classify(np.ones((1, 4)))
+
+    np.testing.assert_allclose(run(main()), [[4]])
@@ -0,0 +1,46 @@
+import json
+
+import numpy as np
+import pytest
+
+from stylish_progress.display import Writer
+
+
+class FailingBackend(object):
+    def write(self, records):
+        raise OSError("disk full")
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        pass
+
+
+def read_rows(logdir):
+    with open(logdir / 'scalars.jsonl', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_bad_value_is_dropped_and_thread_survives(tmp_path):
+    writer = Writer(str(tmp_path), flush_interval=0.01)
+    with pytest.warns(RuntimeWarning, match="'x'"):
+        writer.add_scalars({'x': np.ones(3), 'y': 2.0}, step=1)
+        writer.flush()
+    writer.add_scalar('z', np.float32(3.0), step=2)
+    assert writer._thread.is_alive()
+    writer.close()
+    rows = read_rows(tmp_path)
+    assert [{k: v for k, v in row.items() if k != 'wall_time'} for row in rows] == [
+        {'step': 1, 'y': 2.0}, {'step': 2, 'z': 3.0}]
+
+
+def test_failing_backend_does_not_lose_records_for_others(tmp_path):
+    writer = Writer(str(tmp_path), backend=[FailingBackend(), 'jsonl'], flush_interval=60)
+    writer.add_scalar('loss', 0.5, step=1)
+    with pytest.warns(RuntimeWarning, match="FailingBackend"):
+        writer.flush()
+    writer.add_scalar('loss', 0.25, step=2)
+    with pytest.warns(RuntimeWarning):
+        writer.close()
+    assert [row['loss'] for row in read_rows(tmp_path)] == [0.5, 0.25]
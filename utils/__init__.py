@@ -1,3 +1,2 @@
-from .display import *
 from .etc import *
 from .preprocessing import *
\ No newline at end of file
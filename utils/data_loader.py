@@ -1,59 +1,446 @@
+import hashlib
+import json
+import os
 import numpy as np
 import wfdb
 import pandas as pd
 from pathlib import Path
 
-def load_wfdb_record(record_path):
-    """WFDB 형식의 ECG 레코드 로드"""
+def _cache_path(cache_dir, files, **options):
+    """원본 파일(경로, 크기, 수정 시각)과 로더 옵션으로 만든 캐시 파일 경로"""
+    digest = hashlib.blake2b(digest_size=16)
+    for file in files:
+        stat = os.stat(file)
+        digest.update(f"{os.path.abspath(file)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    digest.update(repr(sorted(options.items())).encode())
+    return Path(cache_dir) / f"{Path(files[0]).stem}-{digest.hexdigest()}.npz"
+
+def _load_cached(cache_path, loader):
+    """캐시가 있으면 읽고, 없으면 loader() 결과를 저장한 뒤 반환"""
+    if cache_path.exists():
+        with np.load(cache_path) as data:
+            second = data['second']
+            # WFDB는 fs 스칼라, CSV는 시간 배열
+            return data['signal'], second.item() if second.ndim == 0 else second
+    signal_data, second = loader()
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_name(cache_path.stem + '.tmp.npz')
+    np.savez(tmp_path, signal=signal_data, second=second)
+    os.replace(tmp_path, cache_path)
+    return signal_data, second
+
+def load_wfdb_record(record_path, channels=0, sampfrom=0, sampto=None,
+                     dtype=np.float32, cache_dir=None):
+    """WFDB 형식의 ECG 레코드 로드
+    
+    Parameters:
+    -----------
+    record_path : str
+        확장자 없는 레코드 경로
+    channels : int or list of int
+        읽을 채널. 정수면 (n,) 배열, 목록이면 (채널 수, n) 배열을 반환합니다.
+    sampfrom, sampto : int
+        읽을 샘플 구간 (긴 레코드의 일부만 읽을 때)
+    dtype : numpy dtype
+        반환 신호의 dtype (float32이면 wfdb에서 바로 32비트로 변환)
+    cache_dir : str, optional
+        지정하면 변환 결과를 바이너리로 저장해 두고 다음 호출에서 재사용합니다.
+    
+    Returns:
+    --------
+    (signal, fs)
+    """
     try:
-        record = wfdb.rdrecord(record_path)
-        return record.p_signal[:, 0], record.fs
+        if cache_dir is not None:
+            files = [f"{record_path}.{ext}" for ext in ('hea', 'dat')
+                     if os.path.exists(f"{record_path}.{ext}")]
+            cache_path = _cache_path(cache_dir, files, channels=channels, sampfrom=sampfrom,
+                                     sampto=sampto, dtype=np.dtype(dtype).str)
+            return _load_cached(cache_path, lambda: load_wfdb_record(
+                record_path, channels, sampfrom, sampto, dtype))
+        
+        single = np.isscalar(channels)
+        record = wfdb.rdrecord(record_path, sampfrom=sampfrom, sampto=sampto,
+                               channels=[channels] if single else list(channels),
+                               return_res=32 if np.dtype(dtype).itemsize <= 4 else 64)
+        signal_data = record.p_signal.astype(dtype, copy=False)
+        # (n, 채널) -> 채널별로 연속인 (채널, n)
+        signal_data = signal_data[:, 0].copy() if single else np.ascontiguousarray(signal_data.T)
+        return signal_data, record.fs
     except Exception as e:
         raise Exception(f"WFDB 레코드 로드 실패: {str(e)}")
 
-def load_csv_data(file_path):
-    """CSV 파일에서 ECG 데이터 로드"""
+def load_csv_data(file_path, usecols='amplitude', sampfrom=0, sampto=None,
+                  dtype=np.float32, engine=None, cache_dir=None):
+    """CSV 파일에서 ECG 데이터 로드
+    
+    'time' 열과 usecols에 지정한 진폭 열만 파싱합니다.
+    
+    Parameters:
+    -----------
+    file_path : str
+        CSV 파일 경로
+    usecols : str or sequence of str
+        진폭 열 이름. 문자열 하나면 (n,) 배열, 여러 개면 (열 수, n) 배열을 반환합니다.
+    sampfrom, sampto : int
+        읽을 행 구간
+    dtype : numpy dtype
+        진폭 dtype (시간 열은 fs 추정 정밀도를 위해 float64 유지)
+    engine : str, optional
+        pandas 파서 엔진 (예: 'pyarrow', 설치된 경우)
+    cache_dir : str, optional
+        지정하면 파싱 결과를 바이너리로 저장해 두고 다음 호출에서 재사용합니다.
+    
+    Returns:
+    --------
+    (amplitude, time)
+    """
     try:
-        df = pd.read_csv(file_path)
-        required_columns = ['time', 'amplitude']
+        if cache_dir is not None:
+            cache_path = _cache_path(cache_dir, [file_path], usecols=usecols, sampfrom=sampfrom,
+                                     sampto=sampto, dtype=np.dtype(dtype).str)
+            return _load_cached(cache_path, lambda: load_csv_data(
+                file_path, usecols, sampfrom, sampto, dtype, engine))
+        
+        single = isinstance(usecols, str)
+        columns = [usecols] if single else list(usecols)
+        required_columns = ['time'] + columns
+        header = pd.read_csv(file_path, nrows=0).columns
+        if not all(col in header for col in required_columns):
+            raise ValueError(f"CSV 파일에 {required_columns} 열이 필요합니다.")
         
-        if not all(col in df.columns for col in required_columns):
-            raise ValueError("CSV 파일에 'time'과 'amplitude' 열이 필요합니다.")
-            
-        return df['amplitude'].values, df['time'].values
+        options = {'usecols': required_columns,
+                   'dtype': dict({col: dtype for col in columns}, time=np.float64)}
+        if engine == 'pyarrow':
+            # pyarrow 엔진은 skiprows 범위/nrows를 지원하지 않으므로 읽은 뒤 자름
+            df = pd.read_csv(file_path, engine=engine, **options).iloc[sampfrom:sampto]
+        else:
+            # 헤더는 이미 읽었으므로 정수 skiprows로 앞부분 행을 세지 않고 건너뜀
+            # (range를 넘기면 pandas가 sampfrom개짜리 집합을 만들어 매우 느림)
+            nrows = None if sampto is None else sampto - sampfrom
+            df = pd.read_csv(file_path, engine=engine, header=None, names=list(header),
+                             skiprows=sampfrom + 1, nrows=nrows, **options)
+        
+        time = df['time'].to_numpy()
+        if single:
+            return df[usecols].to_numpy(), time
+        return np.ascontiguousarray(df[columns].to_numpy().T), time
         
     except Exception as e:
         raise Exception(f"CSV 파일 로드 실패: {str(e)}")
 
-def load_data(file_path):
-    """파일 확장자에 따라 적절한 로더 선택"""
+def load_data(file_path, **kwargs):
+    """파일 확장자에 따라 적절한 로더 선택 (kwargs는 각 로더로 전달)"""
     file_path = Path(file_path)
     
     if file_path.suffix == '.csv':
-        return load_csv_data(file_path)
+        return load_csv_data(file_path, **kwargs)
     elif file_path.suffix in ['.dat', '.hea']:
-        return load_wfdb_record(str(file_path.with_suffix('')))
+        return load_wfdb_record(str(file_path.with_suffix('')), **kwargs)
     else:
         raise ValueError(f"지원하지 않는 파일 형식입니다: {file_path.suffix}")
 
-def save_segments(segments, labels, output_path):
-    """추출된 세그먼트와 레이블 저장"""
+class SegmentStore(object):
+    """``.npy`` 샤드와 인덱스 파일로 구성된 세그먼트 저장소
+    
+    디렉터리 구조::
+        
+        root/index.json                  # 샤드 목록, 세그먼트 shape/dtype
+        root/shard-00000.segments.npy
+        root/shard-00000.labels.npy
+        ...
+    
+    샤드는 ``np.load(mmap_mode='r')``로 열리므로 메모리보다 큰 세그먼트 집합도
+    필요한 부분만 페이지 캐시에서 읽습니다. ``append``로 샤드를 추가할 수 있고,
+    전역 인덱스로 임의 접근하거나 레코드/레이블로 걸러낼 수 있습니다.
+    쓰기는 한 프로세스에서만 한다고 가정합니다.
+    """
+    
+    INDEX_NAME = 'index.json'
+    
+    def __init__(self, root):
+        self.root = Path(root)
+        self._shards = []
+        self._segment_shape = None
+        self._dtype = None
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._arrays = {}
+        self._labels = None
+        
+        index_path = self.root / self.INDEX_NAME
+        if index_path.exists():
+            with open(index_path) as f:
+                index = json.load(f)
+            self._shards = index['shards']
+            self._segment_shape = tuple(index['segment_shape'])
+            self._dtype = np.dtype(index['dtype'])
+            self._update_offsets()
+    
+    def __getstate__(self):
+        # 열린 memmap과 레이블 캐시는 빼고 보냄 (DataLoader 워커에서 다시 열림)
+        state = self.__dict__.copy()
+        state['_arrays'] = {}
+        state['_labels'] = None
+        return state
+    
+    @classmethod
+    def exists(cls, root):
+        """`root`가 세그먼트 저장소인지 확인"""
+        return (Path(root) / cls.INDEX_NAME).exists()
+    
+    def _update_offsets(self):
+        counts = [shard['count'] for shard in self._shards]
+        self._offsets = np.concatenate([[0], np.cumsum(counts, dtype=np.int64)])
+        self._labels = None
+    
+    def _write_index(self):
+        index = {'version': 1,
+                 'segment_shape': list(self._segment_shape),
+                 'dtype': self._dtype.str,
+                 'shards': self._shards}
+        tmp_path = self.root / (self.INDEX_NAME + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp_path, self.root / self.INDEX_NAME)
+    
+    def append(self, segments, labels, record=None, bar=None):
+        """세그먼트와 레이블을 새 샤드로 추가하고 샤드 이름을 반환
+        
+        Parameters:
+        -----------
+        segments : ndarray
+            (n, ...) 형태의 세그먼트. 기존 샤드와 shape/dtype이 같아야 합니다.
+        labels : array_like
+            길이 n의 레이블
+        record : str, optional
+            샤드가 속한 레코드 이름 (``select(record=...)``에 사용)
+        bar : stylish_progress.Bar, optional
+            수동 모드 Bar. 호출할 때마다 reset()한 뒤 기록한 바이트 수만큼
+            진행률이 갱신됩니다.
+        """
+        segments = np.ascontiguousarray(segments)
+        labels = np.asarray(labels)
+        if len(labels) != len(segments):
+            raise ValueError("세그먼트와 레이블의 개수가 다릅니다.")
+        if self._segment_shape is None:
+            self._segment_shape = segments.shape[1:]
+            self._dtype = segments.dtype
+        elif segments.shape[1:] != self._segment_shape or segments.dtype != self._dtype:
+            raise ValueError(f"저장소와 세그먼트 형식이 다릅니다: "
+                             f"{segments.shape[1:]}/{segments.dtype}, "
+                             f"기대값 {self._segment_shape}/{self._dtype}")
+        
+        self.root.mkdir(parents=True, exist_ok=True)
+        name = f"shard-{len(self._shards):05d}"
+        if bar is not None:
+            # 헤더를 뺀 추정치로 시작하고, 다 쓴 뒤 실제로 쓴 바이트 수로 맞춤
+            bar.reset(segments.nbytes + labels.nbytes)
+        for suffix, array in (('segments', segments), ('labels', labels)):
+            path = self.root / f"{name}.{suffix}.npy"
+            tmp_path = path.with_name(path.name + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                np.save(f if bar is None else bar.wrap_file(f), array)
+            os.replace(tmp_path, path)
+        if bar is not None:
+            bar.set_total(bar.stats()['n'])
+            bar.mark_completed()
+        
+        self._shards.append({'name': name, 'count': len(segments), 'record': record})
+        self._write_index()
+        self._update_offsets()
+        return name
+    
+    def _shard_arrays(self, shard_idx):
+        """샤드의 (segments, labels) memmap (처음 접근할 때 열기)"""
+        arrays = self._arrays.get(shard_idx)
+        if arrays is None:
+            name = self._shards[shard_idx]['name']
+            arrays = (np.load(self.root / f"{name}.segments.npy", mmap_mode='r'),
+                      np.load(self.root / f"{name}.labels.npy", mmap_mode='r'))
+            self._arrays[shard_idx] = arrays
+        return arrays
+    
+    def __len__(self):
+        return int(self._offsets[-1])
+    
+    @property
+    def num_shards(self):
+        return len(self._shards)
+    
+    @property
+    def records(self):
+        """샤드별 레코드 이름"""
+        return [shard['record'] for shard in self._shards]
+    
+    @property
+    def labels(self):
+        """전체 레이블 (메모리에 올려 캐시)"""
+        if self._labels is None:
+            if not self._shards:
+                return np.empty(0, dtype=np.int64)
+            self._labels = np.concatenate([self._shard_arrays(i)[1]
+                                           for i in range(len(self._shards))])
+        return self._labels
+    
+    def locate(self, index):
+        """전역 인덱스 -> (샤드 번호, 샤드 내 인덱스)"""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"인덱스 범위를 벗어났습니다: {index}")
+        shard_idx = int(np.searchsorted(self._offsets, index, side='right')) - 1
+        return shard_idx, index - int(self._offsets[shard_idx])
+    
+    def __getitem__(self, index):
+        """정수 인덱스는 (memmap 뷰, 레이블), 슬라이스/배열은 복사본 (segments, labels)"""
+        if isinstance(index, (int, np.integer)):
+            shard_idx, local = self.locate(int(index))
+            segments, labels = self._shard_arrays(shard_idx)
+            return segments[local], labels[local]
+        
+        indices = np.arange(len(self))[index] if isinstance(index, slice) else np.asarray(index)
+        indices = np.where(indices < 0, indices + len(self), indices)
+        if indices.size and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError("인덱스 범위를 벗어났습니다.")
+        shard_ids = np.searchsorted(self._offsets, indices, side='right') - 1
+        
+        out = np.empty((len(indices),) + self._segment_shape, dtype=self._dtype)
+        # 샤드별로 모아 한 번씩 fancy indexing
+        for shard_idx in np.unique(shard_ids):
+            mask = shard_ids == shard_idx
+            segments, _ = self._shard_arrays(shard_idx)
+            out[mask] = segments[indices[mask] - self._offsets[shard_idx]]
+        return out, self.labels[indices]
+    
+    def select(self, record=None, label=None):
+        """레코드 이름 및/또는 레이블로 걸러낸 전역 인덱스 배열
+        
+        record, label에는 값 하나 또는 값 목록을 줄 수 있습니다.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if record is not None:
+            records = {record} if isinstance(record, str) else set(record)
+            mask[:] = False
+            for i, shard in enumerate(self._shards):
+                if shard['record'] in records:
+                    mask[self._offsets[i]:self._offsets[i + 1]] = True
+        if label is not None:
+            mask &= np.isin(self.labels, label)
+        return np.flatnonzero(mask)
+    
+    def dataset(self, indices=None, transform=None):
+        """``SegmentDataset`` 어댑터 생성"""
+        return SegmentDataset(self, indices=indices, transform=transform)
+
+
+class SegmentDataset(object):
+    """``torch.utils.data.Dataset``과 호환되는 SegmentStore 어댑터
+    
+    torch에 의존하지 않으며, ``__getitem__``은 memmap 뷰를 그대로 반환하므로
+    세그먼트는 DataLoader의 collate 단계에서 처음 복사됩니다.
+    memmap 뷰는 읽기 전용이므로 수정이 필요하면 `transform`에서 복사하세요.
+    
+    Usage::
+        
+        store = SegmentStore('segments/')
+        train_set = store.dataset(store.select(label=[0, 1]))
+        loader = DataLoader(train_set, batch_size=256, shuffle=True)
+    """
+    
+    def __init__(self, store, indices=None, transform=None):
+        self.store = store if isinstance(store, SegmentStore) else SegmentStore(store)
+        self.indices = None if indices is None else np.asarray(indices, dtype=np.int64)
+        self.transform = transform
+    
+    def __len__(self):
+        return len(self.store) if self.indices is None else len(self.indices)
+    
+    def __getitem__(self, idx):
+        if self.indices is not None:
+            idx = self.indices[idx]
+        segment, label = self.store[int(idx)]
+        if self.transform is not None:
+            segment = self.transform(segment)
+        return segment, int(label)
+
+
+def save_segments(segments, labels, output_path, bar=None, format='npz', record=None):
+    """추출된 세그먼트와 레이블 저장
+    
+    format='npz'(기본값)이면 npz 파일 하나로 저장하고 ('.npz'가 없으면 붙임),
+    format='store'이면 output_path 디렉터리의 SegmentStore에 샤드로 추가합니다.
+    
+    bar : stylish_progress.Bar, optional
+        수동 모드 Bar (예: ``Bar(None, unit='B', unit_scale=True)``).
+        호출할 때마다 reset()한 뒤 기록한 바이트 수만큼 진행률이 갱신되므로
+        파일 여러 개에 같은 Bar를 쓸 수 있습니다.
+    record : str, optional
+        SegmentStore에 저장할 때 샤드의 레코드 이름
+    """
     try:
         output_path = Path(output_path)
+        if format == 'store':
+            SegmentStore(output_path).append(segments, labels, record=record, bar=bar)
+            return
+        if format != 'npz':
+            raise ValueError(f"지원하지 않는 저장 형식입니다: {format}")
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        np.savez(output_path,
-                 segments=segments,
-                 labels=labels)
+        if bar is None:
+            np.savez(output_path,
+                     segments=segments,
+                     labels=labels)
+            return
+        
+        # np.savez는 경로를 받을 때만 '.npz'를 붙이므로 직접 맞춰 줌
+        if output_path.suffix != '.npz':
+            output_path = output_path.with_name(output_path.name + '.npz')
+        # 헤더를 뺀 추정치로 시작하고, 다 쓴 뒤 실제로 쓴 바이트 수로 맞춤
+        bar.reset(np.asarray(segments).nbytes + np.asarray(labels).nbytes)
+        with open(output_path, 'wb') as f:
+            np.savez(bar.wrap_file(f),
+                     segments=segments,
+                     labels=labels)
+        bar.set_total(bar.stats()['n'])
+        bar.mark_completed()
                  
     except Exception as e:
         raise Exception(f"세그먼트 저장 실패: {str(e)}")
 
-def load_segments(file_path):
-    """저장된 세그먼트와 레이블 로드"""
+def load_segments(file_path, bar=None):
+    """저장된 세그먼트와 레이블 로드
+    
+    file_path가 SegmentStore 디렉터리(save_segments(..., format='store'))이면
+    샤드를 memmap으로 엽니다.
+    샤드가 하나면 복사 없이 memmap을 그대로 반환하고, 여러 개면 하나로 합칩니다.
+    메모리보다 큰 저장소는 SegmentStore/SegmentDataset을 직접 사용하세요.
+    
+    bar : stylish_progress.Bar, optional
+        수동 모드 Bar. 읽은 바이트 수만큼 진행률이 갱신됩니다.
+    """
     try:
-        data = np.load(file_path)
-        return data['segments'], data['labels']
+        if SegmentStore.exists(file_path):
+            store = SegmentStore(file_path)
+            if store.num_shards == 1:
+                segments, labels = store._shard_arrays(0)
+            else:
+                segments, labels = store[:]
+            if bar is not None:
+                bar.reset(segments.nbytes + labels.nbytes)
+                bar.update(segments.nbytes + labels.nbytes)
+                bar.mark_completed()
+            return segments, labels
+        
+        if bar is None:
+            data = np.load(file_path)
+            return data['segments'], data['labels']
+        
+        bar.reset(Path(file_path).stat().st_size)
+        with open(file_path, 'rb') as f:
+            data = np.load(bar.wrap_file(f))
+            segments, labels = data['segments'], data['labels']
+        bar.mark_completed()
+        return segments, labels
         
     except Exception as e:
         raise Exception(f"세그먼트 로드 실패: {str(e)}") 
\ No newline at end of file
@@ -1,31 +1,166 @@
 import os
+import re
+import shutil
+import threading
 import torch
 import numpy as np
 
-def save_checkpoint(model_dir, model, epoch, optimizer=None, save_name=None):
+_CKPT_PATTERN = re.compile(r'^ckpt_ep(\d+)\.pt$')
+LATEST_NAME = 'ckpt_latest.pt'
+
+def _snapshot(obj):
+    """state_dict 안의 텐서를 CPU로 복사 (학습이 계속 값을 바꿔도 안전한 사본)"""
+    if isinstance(obj, torch.Tensor):
+        tensor = obj.detach()
+        if tensor.device.type == 'cpu':
+            return tensor.clone()
+        # GPU -> pinned 메모리로 비동기 복사 (호출한 쪽에서 한 번 동기화)
+        out = torch.empty(tensor.shape, dtype=tensor.dtype, pin_memory=True)
+        return out.copy_(tensor, non_blocking=True)
+    if isinstance(obj, dict):
+        return type(obj)((key, _snapshot(value)) for key, value in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_snapshot(value) for value in obj)
+    return obj
+
+def _atomic_save(state, path):
+    """임시 파일에 쓴 뒤 이름을 바꿔, 중간에 죽어도 깨진 체크포인트가 남지 않게 저장"""
+    tmp_path = path + '.tmp'
+    torch.save(state, tmp_path)
+    os.replace(tmp_path, path)
+
+def _link_latest(path, model_dir):
+    """ckpt_latest.pt를 방금 저장한 파일로 교체 (가능하면 하드 링크, 아니면 복사)"""
+    latest = os.path.join(model_dir, LATEST_NAME)
+    tmp_path = latest + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(path, tmp_path)
+    except OSError:
+        shutil.copyfile(path, tmp_path)
+    os.replace(tmp_path, latest)
+
+class CheckpointManager:
     """
-    모델 체크포인트를 저장합니다.
+    체크포인트 저장/로드 관리자.
+    
+    save()는 학습 스레드에서 state_dict를 CPU로 복사(snapshot)만 하고,
+    직렬화와 디스크 쓰기는 백그라운드 스레드에서 처리합니다. 파일은 임시 파일에
+    쓴 뒤 os.replace로 바꾸고, ckpt_latest.pt를 최신 체크포인트로 갱신하며,
+    ckpt_epXXX.pt는 최근 keep_last개만 남깁니다. 쓰기는 한 번에 하나만 진행되므로
+    이전 저장이 끝나지 않았으면 다음 save()가 기다립니다.
+    
+    사용 예:
+        ckpt = CheckpointManager('checkpoints', keep_last=3)
+        start_epoch = ckpt.load(model, optimizer=optimizer)
+        for epoch in range(start_epoch, num_epochs):
+            ...
+            ckpt.save(model, epoch + 1, optimizer)
+        ckpt.wait()
     """
-    if save_name is None:
-        save_name = 'ckpt_ep{:03d}.pt'.format(epoch)
+    def __init__(self, model_dir, keep_last=5, asynchronous=True, verbose=True):
+        self.model_dir = model_dir
+        self.keep_last = keep_last
+        self.asynchronous = asynchronous
+        self.verbose = verbose
+        self._thread = None
+        self._error = None
+        os.makedirs(model_dir, exist_ok=True)
+    
+    def save(self, model, epoch, optimizer=None, save_name=None, **extra):
+        """
+        체크포인트를 저장합니다 (asynchronous=True이면 쓰기를 기다리지 않고 반환).
+        extra 키워드 인자는 체크포인트 dict에 함께 저장됩니다.
+        """
+        self.wait()
+        if save_name is None:
+            save_name = 'ckpt_ep{:03d}.pt'.format(epoch)
+        
+        state = {'model': model.state_dict(), 'epoch': epoch}
+        if optimizer is not None:
+            state['optimizer'] = optimizer.state_dict()
+        state.update(extra)
+        state = _snapshot(state)
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+        
+        path = os.path.join(self.model_dir, save_name)
+        if not self.asynchronous:
+            self._write(state, path)
+            return path
+        self._thread = threading.Thread(target=self._write_background, args=(state, path),
+                                        name='checkpoint-writer')
+        self._thread.start()
+        return path
     
-    state = {
-        'model': model.state_dict(),
-        'epoch': epoch
-    }
+    def _write(self, state, path):
+        _atomic_save(state, path)
+        _link_latest(path, self.model_dir)
+        self._prune()
+        if self.verbose:
+            print('모델 저장됨: {}'.format(path))
     
-    if optimizer is not None:
-        state['optimizer'] = optimizer.state_dict()
+    def _write_background(self, state, path):
+        try:
+            self._write(state, path)
+        except Exception as e:
+            self._error = e
     
-    torch.save(state, os.path.join(model_dir, save_name))
-    print('모델 저장됨: {}'.format(os.path.join(model_dir, save_name)))
+    def _prune(self):
+        """오래된 ckpt_epXXX.pt 삭제 (keep_last가 None이면 모두 유지)"""
+        if self.keep_last is None:
+            return
+        checkpoints = self.checkpoints()
+        for _, path in checkpoints[:max(len(checkpoints) - self.keep_last, 0)]:
+            os.remove(path)
+    
+    def wait(self):
+        """진행 중인 백그라운드 쓰기가 끝날 때까지 대기 (실패했으면 예외 발생)"""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise Exception(f"체크포인트 저장 실패: {str(error)}")
+    
+    def checkpoints(self):
+        """남아 있는 ckpt_epXXX.pt의 (epoch, 경로) 목록 (오래된 순)"""
+        return sorted((int(match.group(1)), os.path.join(self.model_dir, name))
+                      for name in os.listdir(self.model_dir)
+                      for match in [_CKPT_PATTERN.match(name)] if match)
+    
+    def load(self, model, epoch=None, optimizer=None, mmap=True, map_location=None):
+        """
+        체크포인트를 로드하고 epoch를 반환합니다 (없으면 0).
+        mmap=True이면 파일을 메모리 매핑해 필요한 텐서만 읽습니다.
+        """
+        self.wait()
+        return load_checkpoint(self.model_dir, model, epoch=epoch, optimizer=optimizer,
+                               mmap=mmap, map_location=map_location)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.wait()
+        return False
 
-def load_checkpoint(model_dir, model, epoch=None, optimizer=None):
+def save_checkpoint(model_dir, model, epoch, optimizer=None, save_name=None):
+    """
+    모델 체크포인트를 저장합니다.
+    임시 파일에 쓴 뒤 이름을 바꾸고 ckpt_latest.pt도 갱신합니다.
+    """
+    manager = CheckpointManager(model_dir, keep_last=None, asynchronous=False)
+    manager.save(model, epoch, optimizer=optimizer, save_name=save_name)
+
+def load_checkpoint(model_dir, model, epoch=None, optimizer=None, mmap=False, map_location=None):
     """
     저장된 체크포인트를 로드합니다.
+    mmap=True이면 torch.load(mmap=True)로 파일을 메모리 매핑합니다.
     """
     if epoch is None:
-        path = os.path.join(model_dir, 'ckpt_latest.pt')
+        path = os.path.join(model_dir, LATEST_NAME)
     else:
         path = os.path.join(model_dir, 'ckpt_ep{:03d}.pt'.format(epoch))
     
@@ -34,7 +169,7 @@ def load_checkpoint(model_dir, model, epoch=None, optimizer=None):
         return 0
     
     print('체크포인트 로드 중: {}'.format(path))
-    checkpoint = torch.load(path)
+    checkpoint = torch.load(path, mmap=mmap, map_location=map_location)
     model.load_state_dict(checkpoint['model'])
     
     if optimizer is not None and 'optimizer' in checkpoint:
@@ -48,18 +183,95 @@ def cal_total_params(model):
     """
     return sum(p.numel() for p in model.parameters())
 
-def optimizer_to(optim, device):
+def _bulk_to(slots, device, dtype=None, non_blocking=True):
+    """
+    slots의 텐서를 device로 옮기고 dtype이 주어지면 부동소수점 텐서만 변환합니다.
+    slots는 (dict, 키) 또는 (객체, 속성 이름) 쌍의 목록이며, 옮긴 텐서를 그 자리에 돌려놓습니다.
+    
+    CPU <-> GPU 전송은 (원본 디바이스, dtype)별로 pinned 메모리 연속 버퍼 하나에
+    모아 non_blocking으로 한 번에 보내고, 대상 버퍼의 view를 돌려놓습니다.
+    같은 종류의 디바이스 안에서(CPU <-> CPU dtype 변환 등)는 텐서마다 바로 바꿔서
+    이전 텐서를 곧바로 해제합니다. 큰 버퍼를 새로 잡으면 모든 상태가 두 벌씩
+    메모리에 올라가고 새 페이지를 처음 쓰는 비용이 들어 오히려 느립니다.
+    """
+    device = torch.device(device)
+    groups = {}
+    for slot in slots:
+        tensor = _get_slot(*slot)
+        src_device = tensor.device
+        target_dtype = dtype if dtype is not None and tensor.is_floating_point() else tensor.dtype
+        if src_device == device and tensor.dtype == target_dtype:
+            continue
+        if src_device.type == device.type:
+            _set_slot(*slot, tensor.to(device, dtype=target_dtype))
+            continue
+        groups.setdefault((src_device, target_dtype), []).append(slot)
+    
+    synchronize = False
+    for (src_device, target_dtype), group in groups.items():
+        sources = [_get_slot(*slot).detach() for slot in group]
+        sizes = [t.numel() for t in sources]
+        total = sum(sizes)
+        
+        if device.type == 'cuda':
+            # pinned 버퍼에 모아(변환 포함) 한 번에 비동기 전송
+            staging = torch.empty(total, dtype=target_dtype, pin_memory=True)
+            _gather(sources, staging, sizes)
+            flat = staging.to(device, non_blocking=non_blocking)
+        else:
+            # GPU에서 모은 뒤 pinned 버퍼로 한 번에 비동기 전송
+            gathered = torch.empty(total, dtype=target_dtype, device=src_device)
+            _gather(sources, gathered, sizes)
+            flat = torch.empty(total, dtype=target_dtype, pin_memory=src_device.type == 'cuda')
+            flat.copy_(gathered, non_blocking=non_blocking)
+            synchronize = non_blocking and src_device.type == 'cuda'
+        
+        for slot, source, chunk in zip(group, sources, flat.split(sizes)):
+            _set_slot(*slot, chunk.view(source.shape))
+    
+    if synchronize:
+        # GPU -> CPU 비동기 복사는 끝난 뒤에 CPU에서 읽어야 함
+        torch.cuda.synchronize()
+
+def _gather(sources, flat, sizes):
+    """sources를 flat 버퍼의 연속 구간에 복사 (dtype 변환 포함)"""
+    for source, chunk in zip(sources, flat.split(sizes)):
+        chunk.view(source.shape).copy_(source)
+
+def _get_slot(obj, key):
+    return obj[key] if isinstance(obj, dict) else getattr(obj, key)
+
+def _set_slot(obj, key, tensor):
+    if isinstance(obj, dict):
+        obj[key] = tensor
+    else:
+        setattr(obj, key, tensor)
+
+def optimizer_to(optim, device, dtype=None, non_blocking=True):
     """
     옵티마이저의 상태를 특정 디바이스로 이동합니다.
+    CPU <-> GPU 이동은 dtype별 연속 버퍼로 모아 한 번에 전송하며, dtype을 주면
+    부동소수점 상태를 변환합니다 (예: CPU로 내릴 때 torch.bfloat16).
+    'step'은 dtype을 바꾸지 않습니다.
+    """
+    slots, steps = [], []
+    for state in optim.state.values():
+        for key, value in state.items():
+            if isinstance(value, torch.Tensor):
+                (steps if key == 'step' else slots).append((state, key))
+    
+    _bulk_to(slots, device, dtype, non_blocking)
+    _bulk_to(steps, device, None, non_blocking)
+
+def model_to(model, device, dtype=None, non_blocking=True):
+    """
+    모델의 파라미터, 그래디언트, 버퍼를 optimizer_to와 같은 방식으로 이동합니다.
+    Parameter 객체는 그대로 두고 .data만 바꾸므로 옵티마이저의 참조가 유지됩니다.
     """
-    for param in optim.state.values():
-        if isinstance(param, torch.Tensor):
-            param.data = param.data.to(device)
-            if param._grad is not None:
-                param._grad.data = param._grad.data.to(device)
-        elif isinstance(param, dict):
-            for subparam in param.values():
-                if isinstance(subparam, torch.Tensor):
-                    subparam.data = subparam.data.to(device)
-                    if subparam._grad is not None:
-                        subparam._grad.data = subparam._grad.data.to(device)
\ No newline at end of file
+    params = list(model.parameters())
+    slots = [(p, 'data') for p in params]
+    slots += [(p, 'grad') for p in params if p.grad is not None]
+    slots += [(module._buffers, name) for module in model.modules()
+              for name, buffer in module._buffers.items() if buffer is not None]
+    _bulk_to(slots, device, dtype, non_blocking)
+    return model
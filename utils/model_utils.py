@@ -1,16 +1,138 @@
+import hashlib
+import os
+import queue
+import threading
+import time
+import warnings
 import numpy as np
 import torch
 import onnxruntime as ort
 from pathlib import Path
 
+_GRAPH_OPTIMIZATION = {
+    'disable': ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    'basic': ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    'extended': ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    'all': ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+_EXECUTION_MODE = {
+    'sequential': ort.ExecutionMode.ORT_SEQUENTIAL,
+    'parallel': ort.ExecutionMode.ORT_PARALLEL,
+}
+
+# 프로세스 전체에서 공유하는 세션: (모델 경로, 수정 시각, 옵션) -> InferenceSession
+_SESSION_POOL = {}
+_SESSION_LOCK = threading.Lock()
+
+def get_session(model_path, intra_op_threads=0, inter_op_threads=0, graph_optimization='all',
+                execution_mode='sequential', optimized_model_dir=None, providers=None,
+                shared=True):
+    """옵션을 적용한 ONNX Runtime 세션을 만들거나 풀에서 공유 세션을 반환
+    
+    InferenceSession.run은 스레드 안전하므로, 같은 모델과 옵션을 쓰는
+    ECGClassifier 인스턴스와 스레드는 이 세션(가중치)을 함께 사용합니다.
+    여러 스레드에서 동시에 predict할 때는 intra_op_threads를 작게 잡아
+    코어를 나누어 쓰는 것이 좋습니다.
+    
+    Parameters:
+    -----------
+    model_path : str
+        ONNX 모델 경로
+    intra_op_threads, inter_op_threads : int
+        연산 내부/연산 사이 스레드 수 (0이면 ONNX Runtime 기본값)
+    graph_optimization : str
+        'disable', 'basic', 'extended', 'all'
+    execution_mode : str
+        'sequential' 또는 'parallel' (분기가 많은 그래프에서 inter_op 병렬 실행)
+    optimized_model_dir : str, optional
+        지정하면 최적화된 그래프를 이 디렉터리에 저장하고, 다음 콜드 스타트에서는
+        저장된 그래프를 최적화 없이 바로 읽습니다. 최적화 결과는 하드웨어에 따라
+        달라질 수 있으므로 같은 머신에서만 재사용하세요.
+    providers : list of str, optional
+        실행 공급자 (기본값: CPUExecutionProvider)
+    shared : bool
+        False이면 풀을 거치지 않고 새 세션을 만듭니다.
+    """
+    model_path = Path(model_path).resolve()
+    providers = tuple(providers or ('CPUExecutionProvider',))
+    stat = model_path.stat()
+    key = (str(model_path), stat.st_mtime_ns, stat.st_size, intra_op_threads, inter_op_threads,
+           graph_optimization, execution_mode, optimized_model_dir, providers)
+    
+    with _SESSION_LOCK:
+        session = _SESSION_POOL.get(key) if shared else None
+        if session is None:
+            session = _create_session(model_path, intra_op_threads, inter_op_threads,
+                                      graph_optimization, execution_mode,
+                                      optimized_model_dir, providers, key)
+            if shared:
+                _SESSION_POOL[key] = session
+        return session
+
+def _create_session(model_path, intra_op_threads, inter_op_threads, graph_optimization,
+                    execution_mode, optimized_model_dir, providers, key):
+    """SessionOptions를 채워 세션 생성 (최적화된 그래프 캐시 사용)"""
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = inter_op_threads
+    options.graph_optimization_level = _GRAPH_OPTIMIZATION[graph_optimization]
+    options.execution_mode = _EXECUTION_MODE[execution_mode]
+    
+    load_path = model_path
+    if optimized_model_dir is not None:
+        # 원본 모델(경로, 수정 시각, 크기)과 최적화 수준, 공급자가 같을 때만 재사용
+        digest = hashlib.blake2b(repr(key[:3] + (graph_optimization, providers)).encode(),
+                                 digest_size=8).hexdigest()
+        cached_path = Path(optimized_model_dir) / f"{model_path.stem}-{graph_optimization}-{digest}.onnx"
+        if cached_path.exists():
+            load_path = cached_path
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        else:
+            cached_path.parent.mkdir(parents=True, exist_ok=True)
+            options.optimized_model_filepath = str(cached_path)
+    
+    return ort.InferenceSession(str(load_path), sess_options=options, providers=list(providers))
+
+def clear_session_pool():
+    """공유 세션 풀 비우기 (모델 파일을 바꾼 뒤 메모리를 돌려받을 때)"""
+    with _SESSION_LOCK:
+        _SESSION_POOL.clear()
+
 class ECGClassifier:
-    """ECG 분류 모델 클래스"""
-    def __init__(self, model_path, model_type='onnx'):
+    """ECG 분류 모델 클래스
+    
+    ONNX 모델의 세션 옵션(intra_op_threads, inter_op_threads, graph_optimization,
+    execution_mode, optimized_model_dir, providers)은 get_session으로 전달됩니다.
+    share_session=False이면 풀을 거치지 않고 인스턴스 전용 세션을 만듭니다.
+    
+    PyTorch 모델은 torch_mode로 CPU 추론 방식을 고를 수 있습니다.
+    
+    - None/'eager': 불러온 모델을 그대로 실행
+    - 'quantized': Linear/LSTM/GRU 가중치를 int8로 동적 양자화
+    - 'script': torch.jit.script
+    - 'trace': 첫 predict 입력으로 torch.jit.trace
+    - 'compile': torch.compile (첫 호출에서 컴파일)
+    
+    eager 이외의 모드는 CPU에서 실행되며, check_parity()로 eager 출력과 비교할 수 있습니다.
+    """
+    TORCH_MODES = (None, 'eager', 'quantized', 'script', 'trace', 'compile')
+    
+    def __init__(self, model_path, model_type='onnx', share_session=True, torch_mode=None,
+                 **session_options):
         self.model_path = Path(model_path)
         self.model_type = model_type
+        self.share_session = share_session
+        self.session_options = session_options
+        self.torch_mode = torch_mode
         self.model = None
+        self.eager_model = None
         self.session = None
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self._input_name = None
+        self._engines = {}
+        if torch_mode not in (None, 'eager'):
+            self.device = torch.device('cpu')
+        else:
+            self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         
         self._load_model()
         
@@ -18,19 +140,31 @@ class ECGClassifier:
         """모델 로드"""
         try:
             if self.model_type == 'onnx':
-                self.session = ort.InferenceSession(str(self.model_path))
+                self.session = get_session(self.model_path, shared=self.share_session,
+                                           **self.session_options)
+                self._input_name = self.session.get_inputs()[0].name
             elif self.model_type == 'pytorch':
-                self.model = torch.load(self.model_path, map_location=self.device)
-                self.model.eval()
+                if self.torch_mode not in self.TORCH_MODES:
+                    raise ValueError(f"지원하지 않는 torch_mode입니다: {self.torch_mode}")
+                # 전체 모델을 pickle로 저장한 파일이므로 weights_only=False
+                self.eager_model = torch.load(self.model_path, map_location=self.device,
+                                              weights_only=False)
+                self.eager_model.eval()
+                self.model = self._optimize_torch_model(self.eager_model)
             else:
                 raise ValueError(f"지원하지 않는 모델 형식입니다: {self.model_type}")
                 
         except Exception as e:
             raise Exception(f"모델 로드 실패: {str(e)}")
             
-    def predict(self, segments):
-        """세그먼트 분류"""
+    def predict(self, segments, batch_size=None):
+        """세그먼트 분류
+        
+        batch_size를 지정하면 BatchPredictor로 나누어 예측합니다 ('auto'는 자동 조정).
+        """
         try:
+            if batch_size is not None:
+                return self.engine(batch_size).predict(segments)
             if self.model_type == 'onnx':
                 return self._predict_onnx(segments)
             else:
@@ -39,19 +173,96 @@ class ECGClassifier:
         except Exception as e:
             raise Exception(f"예측 실패: {str(e)}")
             
+    def predict_stream(self, segments, batch_size='auto'):
+        """세그먼트 iterable을 받아 마이크로 배치 단위로 예측을 yield"""
+        return self.engine(batch_size).predict_stream(segments)
+        
+    def engine(self, batch_size='auto', prefetch=None):
+        """설정별로 캐시된 BatchPredictor 반환"""
+        key = (batch_size, prefetch)
+        if key not in self._engines:
+            self._engines[key] = BatchPredictor(self, batch_size=batch_size, prefetch=prefetch)
+        return self._engines[key]
+        
     def _predict_onnx(self, segments):
         """ONNX 모델로 예측"""
-        input_name = self.session.get_inputs()[0].name
-        outputs = self.session.run(None, {input_name: segments.astype(np.float32)})
+        outputs = self.session.run(None, {self._input_name: segments.astype(np.float32, copy=False)})
         return outputs[0]
         
-    def _predict_pytorch(self, segments):
+    def _optimize_torch_model(self, model):
+        """torch_mode에 따라 추론용 모델 생성 ('trace'는 첫 입력이 필요해 나중에)"""
+        if self.torch_mode == 'quantized':
+            return torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear, torch.nn.LSTM, torch.nn.GRU}, dtype=torch.qint8)
+        if self.torch_mode == 'script':
+            return torch.jit.optimize_for_inference(torch.jit.script(model))
+        if self.torch_mode == 'compile':
+            return torch.compile(model)
+        if self.torch_mode == 'trace':
+            return None
+        return model
+        
+    def _to_tensor(self, segments):
+        """float32 연속 배열이면 복사 없이 텐서로 변환"""
+        segments = np.ascontiguousarray(segments, dtype=np.float32)
+        if not segments.flags.writeable:
+            # memmap 등 읽기 전용 배열: 추론 중에는 쓰지 않으므로 경고만 숨김
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)
+                tensor = torch.from_numpy(segments)
+        else:
+            tensor = torch.from_numpy(segments)
+        return tensor.to(self.device)
+        
+    def _predict_pytorch(self, segments, model=None):
         """PyTorch 모델로 예측"""
-        with torch.no_grad():
-            segments = torch.FloatTensor(segments).to(self.device)
-            outputs = self.model(segments)
+        with torch.inference_mode():
+            inputs = self._to_tensor(segments)
+            if model is None:
+                if self.model is None:
+                    # 'trace': 첫 입력으로 그래프를 고정
+                    self.model = torch.jit.optimize_for_inference(
+                        torch.jit.trace(self.eager_model, inputs))
+                model = self.model
+            outputs = model(inputs)
             return outputs.cpu().numpy()
             
+    def check_parity(self, segments, atol=1e-2, rtol=1e-2):
+        """최적화된 모델과 eager 모델의 출력 비교
+        
+        Returns:
+        --------
+        dict : max_abs_diff, 상위 클래스 일치율(top1_agreement), 허용 오차 통과 여부(passed)
+        """
+        if self.model_type != 'pytorch':
+            raise ValueError("check_parity는 pytorch 모델에서만 사용할 수 있습니다.")
+        optimized = self._predict_pytorch(segments)
+        reference = self._predict_pytorch(segments, model=self.eager_model)
+        return {
+            'max_abs_diff': float(np.max(np.abs(optimized - reference))) if optimized.size else 0.0,
+            'top1_agreement': float(np.mean(optimized.argmax(-1) == reference.argmax(-1))),
+            'passed': bool(np.allclose(optimized, reference, atol=atol, rtol=rtol)),
+        }
+        
+    def export_onnx(self, output_path, example, opset_version=17):
+        """불러온 eager 모델을 ONNX로 내보내고 경로 반환 (배치 축은 동적)
+        
+        내보낸 파일은 ECGClassifier(output_path, 'onnx')로 바로 사용할 수 있습니다.
+        """
+        if self.model_type != 'pytorch':
+            raise ValueError("export_onnx는 pytorch 모델에서만 사용할 수 있습니다.")
+        try:
+            output_path = Path(output_path)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            example = self._to_tensor(np.asarray(example)[:1])
+            torch.onnx.export(self.eager_model, example, str(output_path),
+                              input_names=['input'], output_names=['output'],
+                              dynamic_axes={'input': {0: 'batch'}, 'output': {0: 'batch'}},
+                              opset_version=opset_version, dynamo=False)
+            return output_path
+        except Exception as e:
+            raise Exception(f"ONNX 내보내기 실패: {str(e)}")
+            
     def get_class_names(self):
         """클래스 이름 반환"""
         return [
@@ -70,4 +281,187 @@ class ECGClassifier:
             "심실 세동",
             "심실 빈맥",
             "심실 세동"
-        ] 
\ No newline at end of file
+        ] 
+
+
+class BatchPredictor:
+    """ECGClassifier 위에서 동작하는 CPU 마이크로 배치 추론 엔진
+    
+    입력을 batch_size개씩 미리 할당한 float32 버퍼 두 개에 번갈아 복사합니다.
+    prefetch=True이면 다음 배치를 채우는 작업이 별도 스레드에서 진행되어,
+    현재 배치의 추론(ONNX Runtime/PyTorch는 GIL을 놓고 계산)과 겹쳐집니다.
+    
+    Parameters:
+    -----------
+    classifier : ECGClassifier
+        예측에 사용할 분류기
+    batch_size : int or 'auto'
+        마이크로 배치 크기. 'auto'이면 첫 입력으로 1부터 2배씩 늘려 가며 처리량을
+        측정하고, 최대 처리량의 95%에 도달하는 가장 작은 크기를 사용합니다.
+    max_batch_size : int
+        자동 조정 시 시험할 최대 배치 크기
+    prefetch : bool, optional
+        다음 배치 준비를 추론과 겹칠지 여부. None이면 CPU가 2개 이상일 때만 사용
+        (코어가 하나면 두 스레드가 번갈아 실행될 뿐이라 오히려 느려짐).
+    """
+    MAX_POOLED = 4
+    
+    def __init__(self, classifier, batch_size='auto', max_batch_size=2048, prefetch=None):
+        if batch_size != 'auto' and int(batch_size) < 1:
+            raise ValueError(f"batch_size는 1 이상이어야 합니다: {batch_size}")
+        self.classifier = classifier
+        self.batch_size = None if batch_size == 'auto' else int(batch_size)
+        self.max_batch_size = max_batch_size
+        self.prefetch = (os.cpu_count() or 1) > 1 if prefetch is None else prefetch
+        # 스트림마다 버퍼 한 쌍을 빌려 쓰고 끝나면 반납 (같은 스레드에서 스트림 여러 개를
+        # 번갈아 돌려도, 여러 스레드가 동시에 예측해도 버퍼를 공유하지 않음)
+        self._pool = []
+        self._pool_lock = threading.Lock()
+        
+    def _run(self, batch):
+        """버퍼 하나(연속 float32 배열)에 대한 추론"""
+        if self.classifier.model_type == 'onnx':
+            return self.classifier._predict_onnx(batch)
+        return self.classifier._predict_pytorch(batch)
+        
+    def _acquire(self, segment_shape):
+        """(batch_size,) + segment_shape 모양의 float32 버퍼 두 개를 풀에서 빌림 (없으면 할당)"""
+        shape = (self.batch_size,) + tuple(segment_shape)
+        with self._pool_lock:
+            for i, buffers in enumerate(self._pool):
+                if buffers[0].shape == shape:
+                    return self._pool.pop(i)
+        return [np.empty(shape, dtype=np.float32) for _ in range(2)]
+        
+    def _release(self, buffers):
+        """다 쓴 버퍼를 풀에 반납 (최근 MAX_POOLED 쌍만 보관)"""
+        with self._pool_lock:
+            self._pool.append(buffers)
+            del self._pool[:-self.MAX_POOLED]
+        
+    def tune(self, sample, min_time=0.05):
+        """sample 세그먼트 하나로 배치 크기별 처리량을 측정해 batch_size 결정"""
+        sample = np.asarray(sample, dtype=np.float32)
+        best_rate, rates, stalled = 0.0, [], 0
+        size = 1
+        while size <= self.max_batch_size:
+            batch = np.broadcast_to(sample, (size,) + sample.shape).copy()
+            self._run(batch)  # 워밍업
+            runs, start = 0, time.perf_counter()
+            while True:
+                self._run(batch)
+                runs += 1
+                elapsed = time.perf_counter() - start
+                if elapsed >= min_time and runs >= 3:
+                    break
+            rate = runs * size / elapsed
+            rates.append((size, rate))
+            # 측정 잡음을 고려해 두 번 연속으로 5% 이상 늘지 않으면 중단
+            stalled = stalled + 1 if rate < best_rate * 1.05 else 0
+            if stalled == 2:
+                break
+            best_rate = max(best_rate, rate)
+            size *= 2
+        best_rate = max(rate for _, rate in rates)
+        self.batch_size = next(size for size, rate in rates if rate >= 0.95 * best_rate)
+        return self.batch_size
+        
+    def predict(self, segments):
+        """(n, ...) 세그먼트 배열 전체를 예측해 하나의 배열로 반환"""
+        segments = np.asarray(segments)
+        outputs = list(self._stream([segments]))
+        if not outputs:
+            return self._run(np.empty((0,) + segments.shape[1:], dtype=np.float32))
+        return np.concatenate(outputs)
+        
+    def predict_stream(self, segments):
+        """세그먼트를 하나씩 내는 iterable을 받아, 배치가 찰 때마다 예측 배열을 yield"""
+        return self._stream(np.asarray(segment)[None] for segment in segments)
+        
+    def _fill(self, chunks, buffers):
+        """(n_i, ...) 청크들을 버퍼에 순서대로 복사하며 (버퍼 번호, 채운 개수)를 yield"""
+        which, filled = 0, 0
+        for chunk in chunks:
+            offset = 0
+            while offset < len(chunk):
+                take = min(len(chunk) - offset, self.batch_size - filled)
+                buffers[which][filled:filled + take] = chunk[offset:offset + take]
+                filled += take
+                offset += take
+                if filled == self.batch_size:
+                    # send()로 다음 버퍼 번호를 받음 (그냥 next()면 같은 버퍼 재사용)
+                    sent = yield which, filled
+                    which = which if sent is None else sent
+                    filled = 0
+        if filled:
+            yield which, filled
+            
+    def _stream(self, chunks):
+        chunks = (chunk for chunk in chunks if len(chunk))
+        first = next(chunks, None)
+        if first is None:
+            return
+        if self.batch_size is None:
+            self.tune(first[0])
+        buffers = self._acquire(first.shape[1:])
+        try:
+            yield from self._stream_buffers(first, chunks, buffers)
+        finally:
+            self._release(buffers)
+            
+    def _stream_buffers(self, first, chunks, buffers):
+        def all_chunks():
+            yield first
+            yield from chunks
+            
+        if not self.prefetch:
+            # 버퍼 하나를 채우고 추론하기를 반복
+            for which, filled in self._fill(all_chunks(), buffers):
+                yield self._run(buffers[which][:filled])
+            return
+            
+        # 빈 버퍼 번호를 free 큐로 돌려받는 생산자/소비자 구조
+        free, ready = queue.Queue(), queue.Queue(maxsize=1)
+        free.put(1)
+        stop = threading.Event()
+        
+        def producer():
+            try:
+                filler = self._fill(all_chunks(), buffers)
+                item = next(filler, None)
+                while item is not None and not stop.is_set():
+                    ready.put(item)
+                    next_which = free.get()
+                    if next_which is None:
+                        return
+                    try:
+                        item = filler.send(next_which)
+                    except StopIteration:
+                        item = None
+                ready.put(None)
+            except Exception as e:
+                ready.put(e)
+                
+        thread = threading.Thread(target=producer, name="ecg-batch-prefetch", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = ready.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                which, filled = item
+                output = self._run(buffers[which][:filled])
+                free.put(which)
+                yield output
+        finally:
+            # 중간에 멈춘 경우 ready.put에서 기다리는 생산자를 풀어 줌
+            stop.set()
+            free.put(None)
+            while thread.is_alive():
+                try:
+                    ready.get(timeout=0.01)
+                except queue.Empty:
+                    pass
+            thread.join()
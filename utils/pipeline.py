@@ -0,0 +1,158 @@
+import argparse
+import hashlib
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+
+from stylish_progress import Bar
+
+from .data_loader import load_data, save_segments
+from .signal_processing import (apply_bandpass_filter, extract_segments, find_r_peaks,
+                                normalize_signal, remove_baseline)
+
+RECORD_SUFFIXES = ('.csv', '.hea')
+
+
+def collect_records(paths):
+    """파일/디렉터리 목록에서 처리할 레코드 경로 수집 (CSV 파일, WFDB는 .hea 기준)"""
+    records = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            records.extend(sorted(p for p in path.rglob('*') if p.suffix in RECORD_SUFFIXES))
+        else:
+            records.append(path)
+    return records
+
+
+def record_key(path, params):
+    """레코드 내용과 처리 파라미터의 해시 (같으면 이미 처리된 것으로 간주)"""
+    path = Path(path)
+    files = [path]
+    if path.suffix in ('.hea', '.dat'):
+        files = sorted(p for p in path.parent.glob(path.stem + '.*') if p.suffix in ('.hea', '.dat'))
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(sorted(params.items())).encode())
+    for file in files:
+        with open(file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def process_record(path, output_dir, fs=None, segment_size=300, window_size=300,
+                   baseline_method='median', dtype='float32'):
+    """레코드 하나 처리: 로드 -> 베이스라인 제거 -> 대역 통과 -> 정규화 -> R-peak -> 세그먼트 저장
+
+    결과 파일 이름에 내용 해시가 들어가므로, 같은 파일이 이미 있으면 건너뜁니다.
+    워커 프로세스에서 실행되며 결과 요약 dict를 반환합니다.
+    """
+    path = Path(path)
+    params = {'fs': fs, 'segment_size': segment_size, 'window_size': window_size,
+              'baseline_method': baseline_method, 'dtype': dtype}
+    key = record_key(path, params)
+    output_path = Path(output_dir) / f"{path.stem}-{key}.npz"
+    result = {'record': str(path), 'output': str(output_path), 'key': key}
+    if output_path.exists():
+        return dict(result, skipped=True)
+
+    signal_data, second = load_data(path)
+    if path.suffix == '.csv':
+        # CSV 로더는 (amplitude, time)을 반환하므로 시간 열에서 fs 추정
+        record_fs = fs or 1.0 / np.median(np.diff(second))
+    else:
+        record_fs = second
+
+    filtered = remove_baseline(signal_data, method=baseline_method, fs=record_fs)
+    filtered = apply_bandpass_filter(filtered, record_fs)
+    filtered = normalize_signal(filtered)
+    peaks = find_r_peaks(filtered, record_fs, window_size)
+    segments = extract_segments(filtered, peaks, segment_size, dtype=dtype)
+
+    # 주석이 없는 레코드이므로 레이블은 -1 (미지정)
+    labels = np.full(len(segments), -1, dtype=np.int64)
+    tmp_path = output_path.with_name(output_path.stem + '.tmp.npz')
+    save_segments(segments, labels, tmp_path)
+    tmp_path.replace(output_path)
+
+    return dict(result, skipped=False, fs=float(record_fs),
+                n_peaks=len(peaks), n_segments=len(segments))
+
+
+def run_pipeline(paths, output_dir, max_workers=None, max_in_flight=None, **params):
+    """여러 레코드를 프로세스 풀에서 병렬 처리
+
+    동시에 제출되는 작업은 max_in_flight개(기본값: 워커 수의 2배)로 제한해
+    메모리 사용량을 묶어 둡니다. 진행 상황은 Bar 하나에 모아서 표시하고,
+    실패한 레코드는 'error' 항목과 함께 결과에 포함됩니다.
+    """
+    records = collect_records(paths)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * max_workers
+
+    results = []
+    bar = Bar(None, desc="Records", total=len(records), unit='records')
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        pending = {}
+        queue = iter(records)
+
+        def submit_next():
+            for record in queue:
+                future = pool.submit(process_record, record, output_dir, **params)
+                pending[future] = record
+                return
+
+        for _ in range(max_in_flight):
+            submit_next()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                record = pending.pop(future)
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append({'record': str(record), 'error': str(e)})
+                bar.update(1)
+                submit_next()
+
+    if any('error' in r for r in results):
+        bar.mark_interrupted()
+    else:
+        bar.mark_completed()
+    return results
+
+
+def main(argv=None):
+    """명령행 진입점: python -m utils.pipeline DATA_DIR -o OUTPUT_DIR"""
+    parser = argparse.ArgumentParser(description="ECG 레코드 병렬 전처리 및 세그먼트 추출")
+    parser.add_argument('inputs', nargs='+', help="레코드 파일 또는 디렉터리 (.csv, .hea)")
+    parser.add_argument('-o', '--output-dir', required=True, help="세그먼트 저장 디렉터리")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="워커 프로세스 수")
+    parser.add_argument('--max-in-flight', type=int, default=None, help="동시에 처리 중인 최대 레코드 수")
+    parser.add_argument('--fs', type=float, default=None, help="CSV 레코드의 샘플링 주파수")
+    parser.add_argument('--segment-size', type=int, default=300)
+    parser.add_argument('--window-size', type=int, default=300)
+    parser.add_argument('--baseline', default='median', choices=['median', 'cascade', 'decimate'])
+    args = parser.parse_args(argv)
+
+    results = run_pipeline(args.inputs, args.output_dir, max_workers=args.workers,
+                           max_in_flight=args.max_in_flight, fs=args.fs,
+                           segment_size=args.segment_size, window_size=args.window_size,
+                           baseline_method=args.baseline)
+
+    processed = sum(1 for r in results if r.get('skipped') is False)
+    skipped = sum(1 for r in results if r.get('skipped'))
+    failed = [r for r in results if 'error' in r]
+    print(f"처리: {processed}, 건너뜀: {skipped}, 실패: {len(failed)}")
+    for r in failed:
+        print(f"  {r['record']}: {r['error']}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
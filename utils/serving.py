@@ -0,0 +1,208 @@
+import asyncio
+import bisect
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class LatencyHistogram:
+    """요청 지연 시간 히스토그램 (밀리초 단위 구간)"""
+    BOUNDS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self, bounds_ms=BOUNDS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self.reset()
+
+    def reset(self):
+        """기록 초기화"""
+        self.counts = [0] * (len(self.bounds_ms) + 1)  # 마지막 구간은 상한 초과
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        """지연 시간 하나 기록"""
+        ms = seconds * 1000.0
+        self.counts[bisect.bisect_left(self.bounds_ms, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, q):
+        """q 분위수의 근사값 (해당 구간의 상한, ms)"""
+        if not self.count:
+            return 0.0
+        target = q / 100.0 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds_ms + (self.max,), self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def stats(self):
+        """요약 통계 dict"""
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max,
+            'buckets': dict(zip([f"<={b}" for b in self.bounds_ms] + [f">{self.bounds_ms[-1]}"],
+                                self.counts)),
+        }
+
+
+class InferenceService:
+    """ECGClassifier 앞단의 asyncio 추론 서비스
+
+    classify()로 들어온 요청을 max_wait초 동안 또는 max_batch_size개 세그먼트가
+    찰 때까지 모아 predict 한 번으로 처리합니다. 추론은 executor에서 실행되므로
+    이벤트 루프를 막지 않고, 대기열이 max_queue개로 차면 classify()는 자리가
+    날 때까지 기다립니다 (backpressure). workers개의 배치가 동시에 실행될 수
+    있습니다 (ONNX 세션은 스레드 간에 공유됨).
+
+    Usage::
+
+        async with InferenceService(ECGClassifier('model.onnx')) as service:
+            probs = await service.classify(segments)   # (n, n_classes)
+            print(service.stats()['latency']['p99_ms'])
+    """
+    def __init__(self, classifier, max_batch_size=256, max_wait=0.005, max_queue=1024,
+                 workers=1, executor=None, batch_size=None):
+        self.classifier = classifier
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.workers = workers
+        self.batch_size = batch_size  # predict에 넘길 마이크로 배치 크기 (None이면 한 번에)
+        self.latency = LatencyHistogram()
+        self._executor = executor
+        self._own_executor = executor is None
+        self._queue = None
+        self._tasks = []
+        self._n_requests = 0
+        self._n_batches = 0
+        self._n_segments = 0
+
+    async def start(self):
+        """배치 작업 시작 (async with 사용 시 자동 호출)"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix="ecg-inference")
+        self._tasks = [asyncio.create_task(self._batch_loop()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """대기 중인 요청을 모두 처리한 뒤 배치 작업 종료"""
+        if not self._tasks:
+            return
+        await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._own_executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+        return False
+
+    async def classify(self, segments):
+        """(n, ...) 세그먼트를 분류해 (n, ...) 예측을 반환 (다른 요청과 묶여서 처리됨)"""
+        if not self._tasks:
+            raise RuntimeError("서비스가 시작되지 않았습니다. start()를 먼저 호출하세요.")
+        segments = np.asarray(segments, dtype=np.float32)
+        if segments.ndim < 2:
+            raise ValueError(f"segments는 (n, ...) 모양이어야 합니다: {segments.shape}")
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((segments, future))
+        try:
+            return await future
+        finally:
+            self.latency.record(time.perf_counter() - start)
+
+    async def _next_batch(self):
+        """첫 요청을 기다린 뒤 max_wait 안에 들어온 요청을 max_batch_size까지 모음"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        size = len(batch[0][0])
+        deadline = loop.time() + self.max_wait
+        while size < self.max_batch_size:
+            if self._queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self._queue.get_nowait()
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    async def _batch_loop(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                # 이미 취소된 요청은 제외
+                live = [(segments, future) for segments, future in batch if not future.done()]
+                if not live:
+                    continue
+                # 세그먼트 모양별로 묶어 처리해 모양이 다른 요청만 따로 실행됨
+                groups = {}
+                for request in live:
+                    groups.setdefault(request[0].shape[1:], []).append(request)
+                for group in groups.values():
+                    await self._run_batch(group)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _run_batch(self, live):
+        """묶인 요청들을 predict 한 번으로 처리하고 각 future에 결과/예외 전달"""
+        try:
+            segments = np.concatenate([segments for segments, _ in live])
+            outputs = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._predict, segments)
+        except Exception as e:
+            for _, future in live:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self._n_requests += len(live)
+        self._n_batches += 1
+        self._n_segments += len(segments)
+        offset = 0
+        for request, future in live:
+            if not future.done():
+                future.set_result(outputs[offset:offset + len(request)])
+            offset += len(request)
+
+    def _predict(self, segments):
+        return self.classifier.predict(segments, batch_size=self.batch_size)
+
+    def stats(self):
+        """처리한 요청/배치 수, 평균 배치 크기와 지연 시간 통계"""
+        return {
+            'requests': self._n_requests,
+            'batches': self._n_batches,
+            'segments': self._n_segments,
+            'mean_batch_size': self._n_segments / self._n_batches if self._n_batches else 0.0,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'latency': self.latency.stats(),
+        }